@@ -4,9 +4,10 @@
 
 from .types import JSONString, Required, Model
 from .schema import Schema
+from .type_registry import TypeRegistry
 from .operations import Operation
 from .exceptions import UnauthenticatedError, NotFoundError, ForbiddenError, \
-    ValidationError, DuplicateError, IntegrityError
+    ValidationError, DuplicateError, IntegrityError, ConflictError
 from .exposition import ExposedModel, ExposedQuery, ExposedMutation, CustomField
 
 CREATE = Operation.CREATE
@@ -0,0 +1,82 @@
+"""
+    This module defines the `BackgroundExecutor` class, used to run callbacks
+    outside of the request that triggered them (e.g. `on_after_commit` triggers).
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class BackgroundExecutor:
+
+    """
+        Bounded pool of threads running callbacks.
+
+        At most `max_workers + max_pending` callbacks can be waiting or running at
+        the same time; when this limit is reached, submitted callbacks are run in
+        the submitting thread, which slows down producers instead of accumulating
+        work in memory.
+
+        When `synchronous` is `True`, callbacks are always run immediately in the
+        submitting thread, which is convenient for tests.
+
+        Exceptions raised by callbacks are logged, and never propagated.
+    """
+
+    _logger = logging.getLogger('easy_graphql_server.background')
+
+    def __init__(self, max_workers=4, max_pending=1000, synchronous=False):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.synchronous = synchronous
+        self._slots = threading.BoundedSemaphore(max_workers + max_pending)
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def submit(self, callback, *args, **kwargs):
+        """
+            Run `callback` with given arguments, in a thread of the pool when possible.
+        """
+        # synchronous mode, or pool is full
+        if self.synchronous or not self._slots.acquire(blocking=False): # pylint: disable=consider-using-with
+            self._run(callback, args, kwargs)
+            return
+        try:
+            self._get_pool().submit(self._run_and_release, callback, args, kwargs)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def shutdown(self, wait=True):
+        """
+            Stop the threads of the pool, after running pending callbacks if `wait`
+            is `True`; a new pool is started if callbacks are submitted afterwards.
+        """
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait)
+
+    # helpers
+
+    def _get_pool(self):
+        # threads are only started once needed
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers = self.max_workers,
+                    thread_name_prefix = 'easy_graphql_server')
+            return self._pool
+
+    def _run_and_release(self, callback, args, kwargs):
+        try:
+            self._run(callback, args, kwargs)
+        finally:
+            self._slots.release()
+
+    def _run(self, callback, args, kwargs):
+        try:
+            callback(*args, **kwargs)
+        except Exception: # pylint: disable=broad-except
+            self._logger.exception('Error while running background callback %r', callback)
@@ -12,5 +12,7 @@ class ContextValue:
         method when performing GraphQL queries.
     """
 
+    __slots__ = ('authenticated_user',)
+
     def __init__(self, authenticated_user):
         self.authenticated_user = authenticated_user
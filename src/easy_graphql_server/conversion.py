@@ -8,7 +8,6 @@ import re
 import enum
 import datetime
 import decimal
-import threading
 
 from graphql.type.definition import GraphQLType, GraphQLInputField # pylint: disable=
 from graphql import \
@@ -36,9 +35,11 @@ PYTHON_GRAPHQL_TYPES_MAPPING = {
 }
 
 
-_enums_cache = {}
-_enums_cache_lock = threading.Lock()
-
+def _get_or_create_type(schema, name, create, definition):
+    # types are registered per schema, so that they do not leak from one to another
+    if schema is None:
+        return create()
+    return schema.type_registry.get_or_create(name, create, definition, owner=schema)
 
 def to_graphql_enum_key(name, capitalize=True):
     """
@@ -52,21 +53,16 @@ def to_graphql_enum_key(name, capitalize=True):
     return key
 
 def to_graphql_enum_from_choices(prefix, choices, description=None, capitalize=True, schema=None):
-    # pylint: disable=unused-argument
     """
         Create a `GraphQLEnumType` from a list of choices.
 
         Choices must presented as a list of key-value pairs.
     """
-    with _enums_cache_lock:
-        if prefix in _enums_cache:
-            graphql_type = _enums_cache[prefix]
-        else:
-            graphql_type = _enums_cache[prefix] = GraphQLEnumType(f'{prefix}__enum_type', {
-                to_graphql_enum_key(key, capitalize): GraphQLEnumValue(key, value)
-                for key, value in choices
-            }, description=description)
-    return graphql_type
+    enum_name = f'{prefix}__enum_type'
+    return _get_or_create_type(schema, enum_name, lambda: GraphQLEnumType(enum_name, {
+        to_graphql_enum_key(key, capitalize): GraphQLEnumValue(key, value)
+        for key, value in choices
+    }, description=description), (list(choices), description, capitalize))
 
 def to_graphql_enum_from_enum(prefix, enum):
     """
@@ -154,9 +150,6 @@ def to_graphql_type(type_, prefix, for_input=False, schema=None):
             '`Model(...).create_input_format` or `Model(...).update_input_format`')
     raise ValueError(f'Could not convert {type_} to graphql type')
 
-
-_objecttype_cache = {}
-
 def to_graphql_objecttype(type_, prefix, for_input=False, schema=None):
     """
         Returns a `GraphQLInputObjectType` or a `GraphQLObjectType` from a given type.
@@ -170,10 +163,6 @@ def to_graphql_objecttype(type_, prefix, for_input=False, schema=None):
     # already a field
     if isinstance(type_, GraphQLObjectType):
         return type_
-    # in cache
-    cache_key = (prefix, for_input)
-    if cache_key in _objecttype_cache:
-        return _objecttype_cache[cache_key]
     # mapping
     if isinstance(type_, dict):
         if for_input:
@@ -184,16 +173,15 @@ def to_graphql_objecttype(type_, prefix, for_input=False, schema=None):
             object_type_class = GraphQLObjectType
             object_name = f'{prefix}__output_type'
             field_class = GraphQLField
-        object_type = object_type_class(object_name, lambda : {
-            key: field_class(to_graphql_type(
-                type_ = value,
-                prefix = f'{prefix}__{key}',
-                for_input = for_input,
-                schema = schema))
-            for key, value in type_.items()
-        })
-        _objecttype_cache[cache_key] = object_type
-        return object_type
+        return _get_or_create_type(schema, object_name, lambda: object_type_class(
+            object_name, lambda : {
+                key: field_class(to_graphql_type(
+                    type_ = value,
+                    prefix = f'{prefix}__{key}',
+                    for_input = for_input,
+                    schema = schema))
+                for key, value in type_.items()
+            }), (for_input, type_))
     # otherwise
     return GraphQLInputField(type_) if for_input else GraphQLField(type_)
 
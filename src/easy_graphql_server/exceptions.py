@@ -202,3 +202,15 @@ class IntegrityError(BaseError):
         BaseError.__init__(self, 'INTEGRITY', {
             'path': path,
         })
+
+class ConflictError(BaseError):
+    """
+        Thrown when an item was modified by someone else since the version that was
+        expected to be updated.
+    """
+    def __init__(self, path, expected_version, current_version):
+        BaseError.__init__(self, 'CONFLICT', {
+            'path': path,
+            'expected_version': expected_version,
+            'current_version': current_version,
+        })
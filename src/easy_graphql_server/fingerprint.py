@@ -0,0 +1,43 @@
+"""
+    Fingerprint of a built GraphQL schema, used to tell whether a schema is
+    identical to a previously validated one.
+"""
+
+import hashlib
+
+from graphql import GraphQLEnumType, GraphQLUnionType, GraphQLInputObjectType
+from graphql.type.definition import is_object_type, is_interface_type
+
+
+def get_schema_fingerprint(graphql_schema):
+    """
+        Return a hash of the structure of `graphql_schema` (types, fields, arguments
+        and their types); two schemas with the same fingerprint have the same validity.
+    """
+    fingerprint = hashlib.sha256()
+    def update(*parts):
+        fingerprint.update(' '.join(map(str, parts)).encode())
+        fingerprint.update(b'\n')
+    update('query', graphql_schema.query_type)
+    update('mutation', graphql_schema.mutation_type)
+    update('subscription', graphql_schema.subscription_type)
+    for directive in graphql_schema.directives:
+        update('directive', directive.name, sorted(directive.args),
+            sorted(location.name for location in directive.locations))
+    for name in sorted(graphql_schema.type_map):
+        graphql_type = graphql_schema.type_map[name]
+        update(type(graphql_type).__name__, name)
+        if is_object_type(graphql_type) or is_interface_type(graphql_type):
+            update('implements', *sorted(interface.name for interface in graphql_type.interfaces))
+            for field_name, field in graphql_type.fields.items():
+                update('field', field_name, field.type)
+                for argument_name, argument in field.args.items():
+                    update('argument', argument_name, argument.type, repr(argument.default_value))
+        elif isinstance(graphql_type, GraphQLInputObjectType):
+            for field_name, field in graphql_type.fields.items():
+                update('field', field_name, field.type, repr(field.default_value))
+        elif isinstance(graphql_type, GraphQLEnumType):
+            update('values', *graphql_type.values)
+        elif isinstance(graphql_type, GraphQLUnionType):
+            update('types', *sorted(member.name for member in graphql_type.types))
+    return fingerprint.hexdigest()
@@ -5,7 +5,7 @@
 from collections import defaultdict
 
 from .operations import Operation
-from .conversion import to_graphql_objecttype, to_graphql_argument
+from .conversion import to_graphql_objecttype, to_graphql_argument, to_graphql_enum_from_choices
 from .types import Required
 from .orm import ORM
 from .model_config_custom_field import ModelConfigCustomField
@@ -30,9 +30,10 @@ class ModelConfig:
             cannot_delete=False,
             only_when_child_of=None, require_authenticated_user=False, restrict_queried_fields=False,
             has_permission=None, filter_for_user=None,
-            on_before_operation=None, on_after_operation=None,
+            on_before_operation=None, on_after_operation=None, on_after_commit=None,
             allowed_lookups=None, disallowed_lookups=None,
-            custom_fields=None, max_depth=None, limit=-1):
+            custom_fields=None, max_depth=None, limit=-1, searchable_fields=None, flat_filters=True,
+            batch_size=None, version_field=None, can_claim=False):
         # pylint: disable=unused-argument # for callbacks
 
         # store raw options
@@ -46,8 +47,14 @@ class ModelConfig:
         self.only_when_child_of = only_when_child_of
         self.max_depth = max_depth
         self.limit = limit
+        self.searchable_fields = tuple(searchable_fields or ())
+        self.flat_filters = flat_filters
+        self.batch_size = batch_size
+        self.version_field = version_field
+        self.can_claim = can_claim
         # callbacks
-        callbacks_names = ('has_permission', 'filter_for_user', 'on_before_operation', 'on_after_operation')
+        callbacks_names = ('has_permission', 'filter_for_user',
+            'on_before_operation', 'on_after_operation', 'on_after_commit')
         self.callbacks = defaultdict(list)
         for callback_name in callbacks_names:
             local_callback = locals().get(callback_name)
@@ -118,6 +125,21 @@ class ModelConfig:
         # lookups
         self.allowed_lookups = allowed_lookups
         self.disallowed_lookups = disallowed_lookups or ()
+        # type mappings computed so far
+        self._type_mappings = {}
+
+    def get_methods_names(self):
+        """
+            Names of the methods that `expose_methods()` may expose for this model.
+        """
+        if self.only_when_child_of:
+            return set()
+        names = {self.name, self.plural_name}
+        return names | {
+            f'{prefix}_{name}'
+            for prefix in ('create', 'update', 'upsert', 'delete', 'claim')
+            for name in names
+        }
 
     def expose_methods(self):
         """
@@ -130,7 +152,10 @@ class ModelConfig:
         if self.only_when_child_of:
             return
         # available filters for querying
-        filters = self.orm_model_manager.get_filters()
+        filters = self.orm_model_manager.get_filters() if self.flat_filters else {}
+        filters['where'] = self.orm_model_manager.get_where_type()
+        if self.searchable_fields:
+            filters['search'] = graphql_types.String
         # this is the common output format for all methods
         output_type = to_graphql_objecttype(
             type_ = self.get_type_mapping(Operation.READ, require_non_nullable=True),
@@ -155,15 +180,31 @@ class ModelConfig:
                 pass_authenticated_user = True,
                 require_authenticated_user = Operation.CREATE in self.require_authenticated_user,
             )
+            # create many instances
+            self.schema.expose_mutation(
+                name = f'create_{self.plural_name}',
+                input_format = to_graphql_argument(
+                    type_ = {'items': Required([Required(self.get_type_mapping(Operation.CREATE))])},
+                    prefix = f'create_{self.plural_name}',
+                    schema = self.schema,
+                ),
+                output_format = [output_type],
+                method = self.orm_model_manager.decorate(
+                    self.orm_model_manager.create_many),
+                pass_graphql_path = True,
+                pass_graphql_selection = True,
+                pass_authenticated_user = True,
+                require_authenticated_user = Operation.CREATE in self.require_authenticated_user,
+            )
         # expose read methods
         if self.available_operations[Operation.READ]:
             # fetch one instance
             self.schema.expose_query(
                 name = self.name,
-                input_format = self.orm_model_manager.fields_info.unique,
+                input_format = dict(self.orm_model_manager.fields_info.unique),
                 output_format = output_type,
                 method = self.orm_model_manager.decorate(
-                    self.orm_model_manager.read_one),
+                    self.orm_model_manager.read_one, retry=False),
                 pass_graphql_path = True,
                 pass_graphql_selection = True,
                 pass_authenticated_user = True,
@@ -175,7 +216,7 @@ class ModelConfig:
                 input_format = filters,
                 output_format = [output_type],
                 method = self.orm_model_manager.decorate(
-                    self.orm_model_manager.read_many),
+                    self.orm_model_manager.read_many, retry=False),
                 pass_graphql_path = True,
                 pass_graphql_selection = True,
                 pass_authenticated_user = True,
@@ -189,7 +230,8 @@ class ModelConfig:
                 input_format = to_graphql_argument(
                     type_ = dict(
                         {'_': self.get_type_mapping(Operation.UPDATE)},
-                        ** self.orm_model_manager.fields_info.unique),
+                        ** self.orm_model_manager.fields_info.unique,
+                        ** self._get_version_argument()),
                     prefix = f'update_{self.name}',
                     schema = self.schema,
                 ),
@@ -201,12 +243,104 @@ class ModelConfig:
                 pass_authenticated_user = True,
                 require_authenticated_user = Operation.UPDATE in self.require_authenticated_user,
             )
+            # update many instances
+            self.schema.expose_mutation(
+                name = f'update_{self.plural_name}',
+                input_format = to_graphql_argument(
+                    type_ = dict(
+                        {'_': self.get_type_mapping(Operation.UPDATE)},
+                        ** {key: value for key, value in filters.items() if key != 'search'}),
+                    prefix = f'update_{self.plural_name}',
+                    schema = self.schema,
+                ),
+                output_format = {
+                    'count': Required(graphql_types.Int),
+                    'results': Required([Required(output_type)]),
+                },
+                method = self.orm_model_manager.decorate(
+                    self.orm_model_manager.update_many),
+                pass_graphql_path = True,
+                pass_graphql_selection = True,
+                pass_authenticated_user = True,
+                require_authenticated_user = Operation.UPDATE in self.require_authenticated_user,
+            )
+            # claim instances, for models used as work queues
+            if self.can_claim:
+                self.schema.expose_mutation(
+                    name = f'claim_{self.plural_name}',
+                    input_format = to_graphql_argument(
+                        type_ = dict(
+                            {'_': self.get_type_mapping(Operation.UPDATE), 'limit': graphql_types.Int},
+                            ** {key: value for key, value in filters.items() if key != 'search'}),
+                        prefix = f'claim_{self.plural_name}',
+                        schema = self.schema,
+                    ),
+                    output_format = [output_type],
+                    method = self.orm_model_manager.decorate(
+                        self.orm_model_manager.claim_many),
+                    pass_graphql_path = True,
+                    pass_graphql_selection = True,
+                    pass_authenticated_user = True,
+                    require_authenticated_user = Operation.UPDATE in self.require_authenticated_user,
+                )
+        # expose upsert methods
+        if self.available_operations[Operation.CREATE] and self.available_operations[Operation.UPDATE]:
+            upsert_type_mapping = self._get_upsert_type_mapping()
+            require_authenticated_user = bool({Operation.CREATE, Operation.UPDATE}
+                & set(self.require_authenticated_user))
+            # create or update one instance
+            self.schema.expose_mutation(
+                name = f'upsert_{self.name}',
+                input_format = to_graphql_argument(
+                    type_ = dict(
+                        {'_': upsert_type_mapping},
+                        ** self.orm_model_manager.fields_info.unique),
+                    prefix = f'upsert_{self.name}',
+                    schema = self.schema,
+                ),
+                output_format = output_type,
+                method = self.orm_model_manager.decorate(
+                    self.orm_model_manager.upsert_one),
+                pass_graphql_path = True,
+                pass_graphql_selection = True,
+                pass_authenticated_user = True,
+                require_authenticated_user = require_authenticated_user,
+            )
+            # create or update many instances, identified by a unique field in items
+            keys = [
+                field_name
+                for field_name in self.orm_model_manager.fields_info.unique
+                if field_name in upsert_type_mapping
+            ]
+            if keys:
+                self.schema.expose_mutation(
+                    name = f'upsert_{self.plural_name}',
+                    input_format = to_graphql_argument(
+                        type_ = {
+                            'key': Required(to_graphql_enum_from_choices(
+                                prefix = f'{self.types_name}__upsert_key',
+                                choices = [(key, key) for key in keys],
+                                schema = self.schema,
+                            )),
+                            'items': Required([Required(upsert_type_mapping)]),
+                        },
+                        prefix = f'upsert_{self.plural_name}',
+                        schema = self.schema,
+                    ),
+                    output_format = [output_type],
+                    method = self.orm_model_manager.decorate(
+                        self.orm_model_manager.upsert_many),
+                    pass_graphql_path = True,
+                    pass_graphql_selection = True,
+                    pass_authenticated_user = True,
+                    require_authenticated_user = require_authenticated_user,
+                )
         # expose delete method
         if self.available_operations[Operation.DELETE]:
             # delete one instance
             self.schema.expose_mutation(
                 name = f'delete_{self.name}',
-                input_format = self.orm_model_manager.fields_info.unique,
+                input_format = dict(self.orm_model_manager.fields_info.unique),
                 output_format = output_type,
                 method = self.orm_model_manager.decorate(
                     self.orm_model_manager.delete_one),
@@ -215,6 +349,18 @@ class ModelConfig:
                 pass_authenticated_user = True,
                 require_authenticated_user = Operation.DELETE in self.require_authenticated_user,
             )
+            # delete many instances
+            self.schema.expose_mutation(
+                name = f'delete_{self.plural_name}',
+                input_format = {key: value for key, value in filters.items() if key != 'search'},
+                output_format = {'count': Required(graphql_types.Int)},
+                method = self.orm_model_manager.decorate(
+                    self.orm_model_manager.delete_many),
+                pass_graphql_path = True,
+                pass_graphql_selection = True,
+                pass_authenticated_user = True,
+                require_authenticated_user = Operation.DELETE in self.require_authenticated_user,
+            )
 
     # concatenate
 
@@ -243,13 +389,47 @@ class ModelConfig:
 
             Using recursion, it allows nesting, in a way that we never go through a given foreign
             key twice.
+
+            Mappings are memoized until `clear_type_mappings()` is called; a shallow copy is
+            returned, nested mappings must not be modified.
         """
-        fields_info = self.orm_model_manager.fields_info
-        exclude = exclude or set()
-        mapping = {}
+        exclude = frozenset(exclude or ())
         # check depth
         if self.max_depth is not None and (max_depth is None or self.max_depth < max_depth):
             max_depth = self.max_depth
+        # already computed
+        key = (operation, exclude, depth, linked_field, with_custom_fields, max_depth, require_non_nullable)
+        if key in self._type_mappings:
+            self.schema.stats['type_mappings_reused'] += 1
+        else:
+            self.schema.stats['type_mappings_computed'] += 1
+            self._type_mappings[key] = self._make_type_mapping(*key)
+        return dict(self._type_mappings[key])
+
+    def clear_type_mappings(self):
+        """
+            Forget memoized type mappings, which depend on the other exposed models.
+        """
+        self._type_mappings.clear()
+
+    def is_linked_to(self, model_config):
+        """
+            Whether this model and the one of `model_config` are linked through a
+            foreign or related field.
+        """
+        return any(
+            field.orm_model is other_manager.orm_model
+            for this_manager, other_manager in (
+                (self.orm_model_manager, model_config.orm_model_manager),
+                (model_config.orm_model_manager, self.orm_model_manager),
+            )
+            for field in this_manager.fields_info.linked.values()
+        )
+
+    def _make_type_mapping(self, operation, exclude, depth, linked_field,
+            with_custom_fields, max_depth, require_non_nullable):
+        fields_info = self.orm_model_manager.fields_info
+        mapping = {}
         # no mapping for deletion
         if operation == Operation.DELETE:
             return {}
@@ -259,6 +439,9 @@ class ModelConfig:
             if operation in (Operation.CREATE, Operation.UPDATE):
                 if depth == 0 and field_name == fields_info.primary:
                     continue
+                # versions are only handled by the model manager
+                if field_name == self.version_field:
+                    continue
             # ensure the field is exposed for this operation
             if operation is not None and not self.can_perform(operation, field_name):
                 continue
@@ -316,6 +499,30 @@ class ModelConfig:
         # result
         return mapping
 
+    def _get_version_argument(self):
+        """
+            Optional argument to pass the expected version to `update_...`, if the
+            model has a version field.
+        """
+        if not self.version_field:
+            return {}
+        return {self.version_field: self.orm_model_manager.fields_info.value[self.version_field]}
+
+    def _get_upsert_type_mapping(self):
+        """
+            Mapping for the data of upsert methods: fields that can be both created and
+            updated, where unique fields are optional (as the key can be given aside).
+        """
+        fields_info = self.orm_model_manager.fields_info
+        mapping = {}
+        for field_name, graphql_type in self.get_type_mapping(Operation.CREATE).items():
+            if not self.can_perform(Operation.UPDATE, field_name):
+                continue
+            if field_name in fields_info.unique and isinstance(graphql_type, Required):
+                graphql_type = graphql_type.type_
+            mapping[field_name] = graphql_type
+        return mapping
+
     # required
 
     @classmethod
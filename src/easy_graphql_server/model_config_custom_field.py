@@ -9,6 +9,9 @@ class ModelConfigCustomField:
         Configuration of a custom field added to an exposed model.
     """
 
+    __slots__ = ('name', 'format', 'read_one', 'read_many', 'update_one', 'update_many',
+        'create_one', 'create_many')
+
     def __init__(self, name, format, read_one=None, read_many=None,
             update_one=None, update_many=None, create_one=None, create_many=None):
         self.name = name
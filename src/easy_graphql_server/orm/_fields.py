@@ -2,17 +2,30 @@
     Definition of `ForeignField`, `RelatedField` and, most importantly, `FieldsInfo`.
 """
 
+import sys
+import types
+
 
 class LinkedField:
     # pylint: disable=too-few-public-methods
     """
         Base class for `ForeignField` and `RelatedField`.
+
+        Instances are immutable.
     """
 
+    __slots__ = ('orm_model', 'field_name', 'value_field_name')
+
     def __init__(self, orm_model, value_field_name, field_name):
         self.orm_model = orm_model
-        self.field_name = field_name
-        self.value_field_name = value_field_name
+        self.field_name = sys.intern(field_name)
+        self.value_field_name = sys.intern(value_field_name)
+
+    def __setattr__(self, name, value):
+        # attributes can only be set upon initialization
+        if hasattr(self, name):
+            raise AttributeError(f'`{self.__class__.__name__}` instances are immutable')
+        super().__setattr__(name, value)
 
     def __repr__(self):
         return (f'<{self.__class__.__name__} orm_model={self.orm_model.__name__} '
@@ -30,6 +43,7 @@ class ForeignField(LinkedField): # pylint: disable=too-few-public-methods
         `value_field_name` is the actual foreign key, bearing the value of the
         primary key on the other model.
     """
+    __slots__ = ()
 
 class RelatedField(LinkedField): # pylint: disable=too-few-public-methods
     """
@@ -42,12 +56,16 @@ class RelatedField(LinkedField): # pylint: disable=too-few-public-methods
         `value_field_name` is the actual foreign key on the other ORM model, bearing the value
         of the primary key on the given model.
     """
+    __slots__ = ()
 
 
 class FieldsInfo: # pylint: disable=too-few-public-methods
     """
         Info about fields for a given ORM model.
     """
+    __slots__ = ('primary', 'unique', 'value', 'foreign', 'related', 'linked',
+        'mandatory', 'nullable', 'custom')
+
     def __init__(self):
         # primary key as `str`
         self.primary = None
@@ -73,3 +91,17 @@ class FieldsInfo: # pylint: disable=too-few-public-methods
             Merge `self.foreign` and `self.related` into `self.linked`
         """
         self.linked = dict(self.foreign, **self.related)
+
+    def freeze(self):
+        """
+            Once computed, intern field names, turn mappings into read-only proxies,
+            and sets of names into `frozenset`
+        """
+        self.primary = sys.intern(self.primary) if self.primary is not None else None
+        for attribute in ('unique', 'value', 'foreign', 'related', 'linked'):
+            mapping = getattr(self, attribute)
+            if mapping is not None:
+                setattr(self, attribute, types.MappingProxyType(
+                    {sys.intern(key): value for key, value in mapping.items()}))
+        for attribute in ('mandatory', 'nullable', 'custom'):
+            setattr(self, attribute, frozenset(map(sys.intern, getattr(self, attribute))))
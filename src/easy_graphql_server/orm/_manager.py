@@ -2,12 +2,13 @@
     Definition of `ModelManager` base class.
 """
 
+import graphql.type.definition
+
 from .. import graphql_types
 from ..operations import Operation
+from ..conversion import to_graphql_objecttype
 from ._lookups import LOOKUPS
 
-import graphql.type.definition
-
 
 class ModelManager:
     """
@@ -20,16 +21,58 @@ class ModelManager:
         self.orm_model = orm_model
         self.model_config = model_config
         self.restrict_queried_fields = restrict_queried_fields
+        self._where_type = None
+        self._linked_managers = None
 
     @property
     def fields_info(self):
         if not hasattr(self, '_fields_info'):
-            self._fields_info = self.get_fields_info()
-            self._fields_info.compute_linked()
+            # only published once complete, for concurrent readers
+            fields_info = self.get_fields_info()
+            fields_info.compute_linked()
             for custom_field in self.model_config.custom_fields:
-                self._fields_info.custom.add(custom_field.name)
+                fields_info.custom.add(custom_field.name)
+            fields_info.freeze()
+            self._fields_info = fields_info
         return self._fields_info
 
+    # linked models
+
+    def link_managers(self):
+        """
+            Resolve the managers of the exposed models linked through foreign & related
+            fields; done when the GraphQL schema is built.
+
+            Returns them as a `dict`, indexed by field name.
+        """
+        linked_managers = self._linked_managers
+        if linked_managers is not None:
+            return linked_managers
+        linked_managers = {}
+        for field_name, field in self.fields_info.linked.items():
+            other_model_config = self.model_config.schema.get_model_config(orm_model=field.orm_model)
+            if other_model_config is not None:
+                linked_managers[field_name] = other_model_config.orm_model_manager
+        self._linked_managers = linked_managers
+        return linked_managers
+
+    def unlink_managers(self):
+        """
+            Forget the resolved managers, when models are exposed afterwards.
+        """
+        self._linked_managers = None
+
+    def get_linked_manager(self, field_name):
+        """
+            Retrieve the manager of the exposed model linked through the given foreign
+            or related field, `None` if this model is not exposed.
+        """
+        # read once, as `unlink_managers()` may be called concurrently
+        linked_managers = self._linked_managers
+        if linked_managers is None:
+            linked_managers = self.link_managers()
+        return linked_managers.get(field_name)
+
     # metadata extraction
 
     def get_fields_info(self):
@@ -86,6 +129,134 @@ class ModelManager:
         # result
         return filters
 
+    def get_where_type(self):
+        """
+            Retrieve the structured filter type for the given ORM model, to be used as
+            the `where` argument of collection queries.
+
+            The same type is reused at every level: `and`, `or` and `not` refer to it,
+            linked fields refer to the type of the other model, and value fields map
+            lookup names to values (`exact` standing for equality), for instance:
+
+            ```gql
+            {or: [{first_name: {startswith: "A"}}, {birth_date: {year: {gt: 1985}}}]}
+            ```
+        """
+        if self._where_type is None:
+            mapping = {}
+            # create the type first, so the mapping can refer to it (or to
+            # types of linked models referring back to it): fields are only
+            # read from the mapping once the schema is built
+            self._where_type = to_graphql_objecttype(
+                type_ = mapping,
+                prefix = f'{self.model_config.types_name}__where',
+                for_input = True,
+                schema = self.model_config.schema)
+            mapping.update(self._get_where_mapping())
+        return self._where_type
+
+    def _get_where_mapping(self):
+        schema = self.model_config.schema
+        mapping = {
+            'and': [self._where_type],
+            'or': [self._where_type],
+            'not': self._where_type,
+        }
+        # value fields
+        value_mapping = self.model_config.get_type_mapping(
+            operation = Operation.READ,
+            with_custom_fields = False,
+            max_depth = 0)
+        for field_name, graphql_type in value_mapping.items():
+            lookups_mapping = self._get_where_lookups_mapping(graphql_type)
+            if lookups_mapping:
+                mapping[field_name] = to_graphql_objecttype(
+                    type_ = lookups_mapping,
+                    prefix = f'{self.model_config.types_name}__where__{field_name}',
+                    for_input = True,
+                    schema = schema)
+        # foreign & related fields
+        if self.model_config.max_depth != 0:
+            for field_name, field in self.fields_info.linked.items():
+                if not self.model_config.can_perform(Operation.READ, field_name):
+                    continue
+                other_model_config = schema.get_model_config(orm_model=field.orm_model)
+                if other_model_config is None:
+                    continue
+                if not other_model_config.can_expose_from_parent(self.orm_model):
+                    continue
+                mapping[field_name] = other_model_config.orm_model_manager.get_where_type()
+        return mapping
+
+    def _get_where_lookups_mapping(self, graphql_type):
+        # enums
+        if isinstance(graphql_type, graphql.type.definition.GraphQLEnumType):
+            mapping = {'exact': graphql_type}
+            if self.model_config.is_lookup_allowed('in'):
+                mapping['in'] = graphql_types.List(graphql_type)
+            if self.model_config.is_lookup_allowed('isnull'):
+                mapping['isnull'] = graphql_types.Boolean
+            return mapping
+        # other value fields
+        if graphql_type not in LOOKUPS:
+            return None
+        mapping = {'exact': graphql_type}
+        date_time_types = (graphql_types.Date, graphql_types.DateTime, graphql_types.Time)
+        for lookup_name, lookup_graphql_type in LOOKUPS[graphql_type].items():
+            if not self.model_config.is_lookup_allowed(lookup_name):
+                continue
+            # date/time parts accept the same lookups as integers
+            if graphql_type in date_time_types and lookup_graphql_type == graphql_types.Int:
+                mapping[lookup_name] = self._get_where_lookups_mapping(graphql_types.Int)
+            else:
+                mapping[lookup_name] = lookup_graphql_type
+        return mapping
+
+    def get_where_shape(self, where):
+        """
+            Split a `where` argument value into its shape and its values.
+
+            The shape is a hashable description of the structure of the filter (which
+            fields, lookups and operators are used), regardless of the values being
+            compared; it can be compiled once and reused for every filter with the
+            same structure. Values are returned as a `list`, in the order in which
+            they appear in the shape.
+        """
+        shape = []
+        values = []
+        for key, value in where.items():
+            # boolean operators
+            if key in ('and', 'or'):
+                items_shapes = []
+                for item in value:
+                    item_shape, item_values = self.get_where_shape(item)
+                    items_shapes.append(item_shape)
+                    values += item_values
+                shape.append((key, None, tuple(items_shapes)))
+            elif key == 'not':
+                not_shape, not_values = self.get_where_shape(value)
+                shape.append((key, None, not_shape))
+                values += not_values
+            # foreign & related fields
+            elif key in self.fields_info.linked:
+                linked_shape, linked_values = self.get_linked_manager(key).get_where_shape(value)
+                shape.append(('linked', key, linked_shape))
+                values += linked_values
+            # value fields
+            else:
+                lookups = []
+                for lookup_name, lookup_value in value.items():
+                    # date/time parts
+                    if isinstance(lookup_value, dict):
+                        for int_lookup_name, int_lookup_value in lookup_value.items():
+                            lookups.append(f'{lookup_name}__{int_lookup_name}')
+                            values.append(int_lookup_value)
+                    else:
+                        lookups.append(lookup_name)
+                        values.append(lookup_value)
+                shape.append(('value', key, tuple(lookups)))
+        return tuple(shape), values
+
     def get_table_name(self):
         raise NotImplementedError()
 
@@ -99,6 +270,17 @@ class ModelManager:
         """
         raise NotImplementedError()
 
+    def create_many(self, authenticated_user, graphql_path, graphql_selection, items=None):
+        """
+            Create many instances of the given ORM model, from the list of `dict` in `items`.
+
+            All instances are validated before any of them is saved.
+
+            Result is a `list` of `dict`, corresponding to the format given by `graphql_selection`,
+            in the same order as `items`.
+        """
+        raise NotImplementedError()
+
     def read_one(self, authenticated_user, graphql_path, graphql_selection, **filters):
         """
             Read one instance of the given ORM model.
@@ -107,10 +289,17 @@ class ModelManager:
         """
         raise NotImplementedError()
 
-    def read_many(self, authenticated_user, graphql_path, graphql_selection, **filters):
+    def read_many(self, authenticated_user, graphql_path, graphql_selection, search=None, where=None,
+            **filters):
         """
             Read many instance of the given ORM model.
 
+            When `search` is given, instances are also filtered with a full-text search on
+            the model's searchable fields, and ordered by relevance.
+
+            When `where` is given, instances are also filtered with the structured filter
+            described by `get_where_type()`.
+
             Result is a `list` of `dict`, corresponding to the format given by `graphql_selection`.
         """
         raise NotImplementedError()
@@ -123,6 +312,28 @@ class ModelManager:
         """
         raise NotImplementedError()
 
+    def update_many(self, authenticated_user, graphql_path, graphql_selection, _=None, where=None,
+            **filters):
+        """
+            Update every instance of the given ORM model matching the filters (same as
+            `read_many()`), with the data in `_`.
+
+            Result is a `dict` with the `count` of updated instances, and their `results`
+            as a `list` of `dict`, corresponding to the format given by `graphql_selection`.
+        """
+        raise NotImplementedError()
+
+    def claim_many(self, authenticated_user, graphql_path, graphql_selection, _=None, limit=1,
+            where=None, **filters):
+        """
+            Lock up to `limit` instances of the given ORM model matching the filters (same
+            as `read_many()`) that are not being claimed by a concurrent transaction, and
+            update them with the data in `_`.
+
+            Result is a `list` of `dict`, corresponding to the format given by `graphql_selection`.
+        """
+        raise NotImplementedError()
+
     def delete_one(self, authenticated_user, graphql_path, graphql_selection, **filters):
         """
             Delete one instance of the given ORM model.
@@ -131,6 +342,35 @@ class ModelManager:
         """
         raise NotImplementedError()
 
+    def delete_many(self, authenticated_user, graphql_path, graphql_selection, where=None, **filters):
+        """
+            Delete every instance of the given ORM model matching the filters (same as
+            `read_many()`).
+
+            Result is a `dict` with the `count` of deleted instances.
+        """
+        raise NotImplementedError()
+
+    def upsert_one(self, authenticated_user, graphql_path, graphql_selection, _=None, **key):
+        """
+            Update the instance of the given ORM model identified by the unique field in
+            `key` with the data in `_`, or create it if it does not exist.
+
+            Result is a `dict`, corresponding to the format given by `graphql_selection`.
+        """
+        raise NotImplementedError()
+
+    def upsert_many(self, authenticated_user, graphql_path, graphql_selection, key=None, items=None):
+        """
+            For every `dict` in `items`, update the instance of the given ORM model with
+            the same value for the unique field named `key`, or create it if it does
+            not exist.
+
+            Result is a `list` of `dict`, corresponding to the format given by `graphql_selection`,
+            in the same order as `items`.
+        """
+        raise NotImplementedError()
+
     #
 
     def _extract_custom_fields_data(self, operation, data):
@@ -168,10 +408,25 @@ class ModelManager:
 
     # methods should be executed within an atomic database transaction
 
-    def decorate(self, method):
+    def decorate(self, method, graphql_path=None, retry=True):
         """
             Decorator to execute a given method within a transaction, using
-            the corresponding ORM.
+            the corresponding ORM; `retry` tells whether the transaction can be run
+            again upon a conflict with a concurrent one.
+        """
+        raise NotImplementedError()
+
+    # mutations of a GraphQL document can be executed within a single transaction
+
+    @staticmethod
+    def atomic_document():
+        """
+            Context manager opening a transaction for all the mutations of a GraphQL
+            document, using the corresponding ORM; it yields an object with a
+            `rollback()` method, which cancels every mutation of the document.
+
+            Cross-object validation is deferred until the context is left, and may raise
+            an `easy_graphql_server.exceptions.ValidationError`.
         """
         raise NotImplementedError()
 
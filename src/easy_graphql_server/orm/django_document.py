@@ -0,0 +1,85 @@
+"""
+    Document-level transactions with Django: all the mutations of a GraphQL document
+    are performed within a single database transaction, and cross-object validation
+    (`clean_related()`) is deferred to the end of the document.
+"""
+
+import contextlib
+import threading
+
+import django.core.exceptions
+import django.db.transaction
+
+from .. import exceptions
+from .django_errors import serialize_django_validation_error
+
+
+_local = threading.local()
+
+
+class AtomicDocument:
+
+    """
+        State of the document-level transaction opened in the current thread.
+    """
+
+    def __init__(self):
+        self.rolled_back = False
+        self._deferred_validations = {}
+
+    def defer_clean_related(self, instance, graphql_path):
+        """
+            Call `instance.clean_related()` at the end of the document; instances
+            written many times are only validated once, in their final state.
+        """
+        key = (type(instance), instance.pk)
+        self._deferred_validations.pop(key, None)
+        self._deferred_validations[key] = (instance, graphql_path)
+
+    def rollback(self):
+        """
+            Roll back every mutation of the document.
+        """
+        django.db.transaction.set_rollback(True)
+        self.rolled_back = True
+
+    def clean_related(self):
+        """
+            Perform deferred validations, and raise a single `ValidationError` gathering
+            the issues of every instance.
+        """
+        issues = []
+        for instance, graphql_path in self._deferred_validations.values():
+            # deleted afterwards
+            if instance.pk is None:
+                continue
+            try:
+                instance.clean_related()
+            except django.core.exceptions.ValidationError as exception:
+                issues += serialize_django_validation_error(graphql_path, exception)
+        if issues:
+            raise exceptions.ValidationError(issues)
+
+
+def get_atomic_document():
+    """
+        Returns the `AtomicDocument` opened in the current thread, if any.
+    """
+    return getattr(_local, 'document', None)
+
+@contextlib.contextmanager
+def atomic_document():
+    """
+        Context manager opening a document-level transaction; deferred validations
+        are performed when leaving it, unless it was rolled back.
+    """
+    document = AtomicDocument()
+    previous_document = get_atomic_document()
+    _local.document = document
+    try:
+        with django.db.transaction.atomic():
+            yield document
+            if not document.rolled_back:
+                document.clean_related()
+    finally:
+        _local.document = previous_document
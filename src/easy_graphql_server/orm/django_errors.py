@@ -3,7 +3,11 @@ import inspect
 from .. import exceptions
 
 
-def reraise_from_django_validation_error(graphql_path, exception):
+def serialize_django_validation_error(graphql_path, exception):
+    """
+        Convert a Django `ValidationError` into a list of issues, as expected by
+        `easy_graphql_server.exceptions.ValidationError`.
+    """
 
     def serialize(issue, path, field_name=None):
         if hasattr(issue, 'error_dict'):
@@ -34,5 +38,9 @@ def reraise_from_django_validation_error(graphql_path, exception):
                     'params': getattr(error, 'params', {}),
                     'code': getattr(error, 'code', None),
                 }
-    issues = list(serialize(exception, graphql_path))
+    return list(serialize(exception, graphql_path))
+
+
+def reraise_from_django_validation_error(graphql_path, exception):
+    issues = serialize_django_validation_error(graphql_path, exception)
     raise exceptions.ValidationError(issues) from exception
@@ -2,9 +2,17 @@
     Definition of `DjangoModelManager` class.
 """
 
+import copy
+import datetime
+import functools
+import time
+from collections import defaultdict
+
 import django.db
 import django.db.models
 import django.db.transaction
+import django.utils.timezone
+from django.db.models.deletion import Collector
 from django.conf import settings
 try:
     import django.contrib.postgres.fields
@@ -17,11 +25,29 @@ from .. import graphql_types
 from .. import conversion
 from .. import exceptions
 from ..operations import Operation
-from .django_errors import reraise_from_django_validation_error
+from .django_document import atomic_document, get_atomic_document
+from .django_errors import reraise_from_django_validation_error, serialize_django_validation_error
+from .django_retry import is_retryable_error, get_retry_delay
+from .django_search import apply_search
+from .django_upsert import supports_native_upsert, native_upsert
+from .django_where import where_to_q
 from ._manager import ModelManager
 from ._fields import FieldsInfo, ForeignField, RelatedField
 
 
+# number of instances loaded at once when they have to be processed one by one
+DEFAULT_CHUNK_SIZE = 1000
+
+
+def _call_after_commit(callback, *args, close_connections=False):
+    try:
+        callback(*args)
+    finally:
+        # connections opened by background threads must not be left open
+        if close_connections:
+            django.db.close_old_connections()
+
+
 class DjangoModelManager(ModelManager):
     """
         ModelManager class for Django ORM.
@@ -79,44 +105,13 @@ class DjangoModelManager(ModelManager):
 
     def create_one(self, authenticated_user, graphql_path, graphql_selection=None, ensure_permission=True,
             depth=0, **data):
-        # related things
-        related_data = {}
-        for field_name in list(data.keys()):
-            if field_name in self.fields_info.foreign:
-                foreign_field = self.fields_info.foreign[field_name]
-                foreign_model_config = self.model_config.schema.get_model_config(
-                    orm_model = foreign_field.orm_model)
-                foreign_instance = foreign_model_config.orm_model_manager.create_one(
-                    authenticated_user = authenticated_user,
-                    graphql_path = graphql_path + [field_name],
-                    ensure_permission = False,
-                    depth = depth + 1,
-                    **data.pop(field_name))
-                data[field_name] = foreign_instance
-            elif field_name in self.fields_info.related:
-                related_data[field_name] = data.pop(field_name)
-        # extract data for custom fields
-        custom_fields_data = self._extract_custom_fields_data(
-            operation = Operation.CREATE,
-            data = data)
-        # instance itself
-        instance = self.orm_model(**data)
-        # custom fields definition
-        self._create_custom_fields(
-            instance = instance,
+        # instance itself, with related things
+        instance, related_data = self._prepare_creation(
             authenticated_user = authenticated_user,
-            data = custom_fields_data)
-        # pre-save trigger
-        self.model_config.on_before_operation(instance, authenticated_user, Operation.CREATE, data, depth)
-        # enforce permissions
-        if ensure_permission:
-            self.model_config.ensure_permission(
-                operation = Operation.CREATE,
-                instance = instance,
-                authenticated_user = authenticated_user,
-                graphql_path = graphql_path,
-                data = data,
-            )
+            graphql_path = graphql_path,
+            ensure_permission = ensure_permission,
+            depth = depth,
+            data = data)
         try:
             # validation
             instance.full_clean()
@@ -125,32 +120,21 @@ class DjangoModelManager(ModelManager):
         except django.core.exceptions.ValidationError as exception:
             reraise_from_django_validation_error(
                 graphql_path, exception)
-        # related data
-        for field_name, children_data in related_data.items():
-            for related_index, related_data in enumerate(children_data):
-                related_field = self.fields_info.related[field_name]
-                related_data[related_field.value_field_name] = instance.pk
-                related_model_config = self.model_config.schema.get_model_config(
-                    orm_model = related_field.orm_model)
-                related_instance = related_model_config.orm_model_manager.create_one(
-                    authenticated_user = authenticated_user,
-                    graphql_path = graphql_path + [field_name, related_index],
-                    ensure_permission = False,
-                    depth = depth + 1,
-                    **related_data)
-                getattr(instance, field_name).add(related_instance)
-        # validation
-        try:
-            if callable(getattr(instance, 'clean_related', None)):
-                instance.clean_related()
-        except django.core.exceptions.ValidationError as exception:
-            reraise_from_django_validation_error(
-                graphql_path, exception)
-        # post-save trigger
-        self.model_config.on_after_operation(instance, authenticated_user, Operation.CREATE, data, depth)
+        # related data, validation & post-save trigger
+        self._complete_creation(
+            instance = instance,
+            related_data = related_data,
+            authenticated_user = authenticated_user,
+            graphql_path = graphql_path,
+            depth = depth,
+            data = data)
         # result
         if graphql_selection is None:
             return instance
+        self._prefetch_for_selection(
+            instances = [instance],
+            graphql_selection = graphql_selection,
+            authenticated_user = authenticated_user)
         return self._instance_to_dict(
             authenticated_user = authenticated_user,
             instance = instance,
@@ -159,6 +143,35 @@ class DjangoModelManager(ModelManager):
             ensure_permission = False,
         )
 
+    def create_many(self, authenticated_user, graphql_path, graphql_selection=None, items=None,
+            ensure_permission=True, depth=0):
+        items_path = graphql_path + ['items']
+        # create instances, with related things
+        items = items or ()
+        instances = self._create_instances(
+            authenticated_user = authenticated_user,
+            graphql_paths = [items_path + [index] for index in range(len(items))],
+            items = items,
+            ensure_permission = ensure_permission,
+            depth = depth)
+        # result, in the same order as the input
+        if graphql_selection is None:
+            return instances
+        self._prefetch_for_selection(
+            instances = instances,
+            graphql_selection = graphql_selection,
+            authenticated_user = authenticated_user)
+        return [
+            self._instance_to_dict(
+                authenticated_user = authenticated_user,
+                instance = instance,
+                graphql_selection = graphql_selection,
+                graphql_path = items_path + [index],
+                ensure_permission = False,
+            )
+            for index, instance in enumerate(instances)
+        ]
+
     def read_one(self, authenticated_user, graphql_path, graphql_selection, **filters):
         instance = self._read_one(
             graphql_selection = graphql_selection,
@@ -173,13 +186,21 @@ class DjangoModelManager(ModelManager):
             ensure_permission = True,
         )
 
-    def read_many(self, authenticated_user, graphql_path, graphql_selection, **filters):
+    def read_many(self, authenticated_user, graphql_path, graphql_selection, search=None, where=None,
+            **filters):
         # build queryset
         queryset = self._read(
             graphql_selection = graphql_selection,
             authenticated_user = authenticated_user,
+            where = where,
             **filters
         )
+        # full-text search
+        if search is not None and self.model_config.searchable_fields:
+            queryset = apply_search(
+                queryset = queryset,
+                fields = self.model_config.searchable_fields,
+                text = search)
         # build results, according to current limits
         if self.model_config.limit > -1:
             results = queryset[:self.model_config.limit]
@@ -206,12 +227,670 @@ class DjangoModelManager(ModelManager):
             _=None, depth=0, **filters):
         # variable that contains new data
         data = _ or {}
+        # version expected by the client, if any
+        version_field = self.model_config.version_field
+        expected_version = filters.pop(version_field, None) if version_field else None
         # retrieve the instance to update
+        read_selection = dict(graphql_selection or {})
+        if version_field:
+            read_selection[version_field] = None
         instance = self._read_one(
-            graphql_selection = graphql_selection or {},
+            graphql_selection = read_selection,
+            authenticated_user = authenticated_user,
+            **filters
+        )
+        # actually update
+        self._update_instance(
+            instance = instance,
+            authenticated_user = authenticated_user,
+            graphql_path = graphql_path,
+            depth = depth,
+            data = data,
+            expected_version = expected_version)
+        # result
+        if graphql_selection is None:
+            return instance
+        self._prefetch_for_selection(
+            instances = [instance],
+            graphql_selection = graphql_selection,
+            authenticated_user = authenticated_user)
+        return self._instance_to_dict(
+            authenticated_user = authenticated_user,
+            instance = instance,
+            graphql_selection = graphql_selection,
+            graphql_path = graphql_path,
+            ensure_permission = True,
+        )
+
+    def update_many(self, authenticated_user, graphql_path, graphql_selection=None,
+            _=None, where=None, depth=0, **filters):
+        # variable that contains new data
+        data = _ or {}
+        graphql_selection = graphql_selection or {}
+        # instances to update
+        queryset = self._read(
+            graphql_selection = {},
+            authenticated_user = authenticated_user,
+            where = where,
+            **filters
+        )
+        # identifiers are only needed when results are requested, in a stable order
+        identifiers = None
+        # single query when no instance-level behaviour is involved...
+        if self._can_bulk_update(data):
+            values = self._get_bulk_update_values(graphql_path, data)
+            if 'results' not in graphql_selection:
+                count = queryset.update(**values) if values else queryset.count()
+            # ...or one per chunk, when updated instances must be known
+            else:
+                identifiers = list(queryset.order_by('pk').values_list('pk', flat=True))
+                if values:
+                    for chunk in self._get_chunks(identifiers):
+                        self.orm_model.objects.filter(pk__in=chunk).update(**values)
+                count = len(identifiers)
+        # otherwise, update instances one by one, chunk after chunk
+        else:
+            identifiers = list(queryset.order_by('pk').values_list('pk', flat=True))
+            index = 0
+            for chunk in self._get_chunks(identifiers):
+                for instance in self.orm_model.objects.filter(pk__in=chunk).order_by('pk'):
+                    self._update_instance(
+                        instance = instance,
+                        authenticated_user = authenticated_user,
+                        graphql_path = graphql_path + [index],
+                        depth = depth,
+                        data = data)
+                    index += 1
+            count = len(identifiers)
+        # result
+        result = {'count': count}
+        if 'results' in graphql_selection:
+            result['results'] = []
+            for chunk in self._get_chunks(identifiers):
+                instances = self.build_queryset(
+                    graphql_selection = graphql_selection['results'],
+                    authenticated_user = authenticated_user,
+                    filter_for_user = False,
+                ).filter(pk__in=chunk).order_by('pk')
+                result['results'] += [
+                    self._instance_to_dict(
+                        authenticated_user = authenticated_user,
+                        instance = instance,
+                        graphql_selection = graphql_selection['results'],
+                        graphql_path = graphql_path + ['results', len(result['results']) + index],
+                        ensure_permission = True,
+                    )
+                    for index, instance in enumerate(instances)
+                ]
+        return result
+
+    def claim_many(self, authenticated_user, graphql_path, graphql_selection=None,
+            _=None, limit=1, where=None, **filters):
+        # variable that contains new data
+        data = _ or {}
+        graphql_selection = graphql_selection or {}
+        if limit is None:
+            limit = 1
+        if limit < 0:
+            raise exceptions.ValidationError([{
+                'path': graphql_path + ['limit'],
+                'message': 'Ensure this value is greater than or equal to 0.',
+                'params': {'limit_value': 0, 'value': limit},
+                'code': 'min_value',
+            }])
+        if self.model_config.limit > -1:
+            limit = min(limit, self.model_config.limit)
+        # instances that can be claimed; the subquery keeps joins out of the locking query
+        queryset = self._read(
+            graphql_selection = {},
             authenticated_user = authenticated_user,
+            where = where,
             **filters
         )
+        candidates = self.orm_model.objects.filter(pk__in=queryset.values('pk'))
+        # claim in a stable order, the model's default one if any
+        if not candidates.ordered:
+            candidates = candidates.order_by('pk')
+        # instances locked by concurrent claims are skipped...
+        if django.db.connections[candidates.db].features.has_select_for_update_skip_locked:
+            instances = list(candidates.select_for_update(skip_locked=True)[:limit])
+        # ...or waited for, and left out if they do not match anymore
+        else:
+            instances = self._claim_one_by_one(candidates, limit)
+        identifiers = [instance.pk for instance in instances]
+        # single query when no instance-level behaviour is involved
+        if self._can_bulk_update(data):
+            values = self._get_bulk_update_values(graphql_path, data)
+            if values:
+                for chunk in self._get_chunks(identifiers):
+                    self.orm_model.objects.filter(pk__in=chunk).update(**values)
+        # otherwise, update instances one by one
+        else:
+            for index, instance in enumerate(instances):
+                self._update_instance(
+                    instance = instance,
+                    authenticated_user = authenticated_user,
+                    graphql_path = graphql_path + [index],
+                    depth = 0,
+                    data = data)
+        # result, in the order instances were claimed
+        results = self.build_queryset(
+            graphql_selection = graphql_selection,
+            authenticated_user = authenticated_user,
+            filter_for_user = False,
+        ).in_bulk(identifiers)
+        return [
+            self._instance_to_dict(
+                authenticated_user = authenticated_user,
+                instance = results[identifier],
+                graphql_selection = graphql_selection,
+                graphql_path = graphql_path + [index],
+                ensure_permission = True,
+            )
+            for index, identifier in enumerate(identifiers)
+        ]
+
+    def delete_one(self, authenticated_user, graphql_path, graphql_selection, **filters):
+        instance = self._read_one(
+            graphql_selection = graphql_selection,
+            authenticated_user = authenticated_user,
+            **filters
+        )
+        self.model_config.ensure_permission(
+            operation = Operation.DELETE,
+            instance = instance,
+            authenticated_user = authenticated_user,
+            graphql_path = graphql_path,
+        )
+        # keep primary key for later result
+        if self.fields_info.primary in graphql_selection:
+            pre_result = {self.fields_info.primary: getattr(instance, self.fields_info.primary)}
+        else:
+            pre_result = {}
+        # actually perform operations
+        self.model_config.on_before_operation(instance, authenticated_user, Operation.DELETE, None, 0)
+        instance.delete()
+        self.model_config.on_after_operation(instance, authenticated_user, Operation.DELETE, None, 0)
+        self._on_after_commit(instance, authenticated_user, Operation.DELETE, None, 0)
+        # compute & return result
+        result = self._instance_to_dict(
+            authenticated_user = authenticated_user,
+            instance = instance,
+            graphql_selection = graphql_selection,
+            graphql_path = graphql_path,
+            ensure_permission = False,
+        )
+        result.update(pre_result)
+        return result
+
+    def delete_many(self, authenticated_user, graphql_path, graphql_selection=None, where=None,
+            **filters):
+        # pylint: disable=protected-access
+        # instances to delete
+        queryset = self._read(
+            graphql_selection = {},
+            authenticated_user = authenticated_user,
+            where = where,
+            **filters
+        )
+        # single query when nothing has to be handled in Python
+        if self._can_bulk_delete() and Collector(using=queryset.db).can_fast_delete(queryset):
+            return {'count': queryset._raw_delete(queryset.db)}
+        # otherwise, delete chunk after chunk, in a stable order
+        identifiers = list(queryset.order_by('pk').values_list('pk', flat=True))
+        index = 0
+        for identifiers_chunk in self._get_chunks(identifiers):
+            chunk = self.orm_model.objects.filter(pk__in=identifiers_chunk).order_by('pk')
+            # cascades & signals are handled by Django's collector
+            if self._can_bulk_delete():
+                chunk.delete()
+            # one by one, with permissions check & triggers
+            else:
+                for instance in chunk:
+                    # errors are reported with the index of the instance
+                    instance_path = graphql_path + [index]
+                    index += 1
+                    self.model_config.ensure_permission(
+                        operation = Operation.DELETE,
+                        instance = instance,
+                        authenticated_user = authenticated_user,
+                        graphql_path = instance_path,
+                    )
+                    try:
+                        self.model_config.on_before_operation(instance, authenticated_user, Operation.DELETE, None, 0)
+                        instance.delete()
+                        self.model_config.on_after_operation(instance, authenticated_user, Operation.DELETE, None, 0)
+                    except django.core.exceptions.ValidationError as exception:
+                        reraise_from_django_validation_error(instance_path, exception)
+                    self._on_after_commit(instance, authenticated_user, Operation.DELETE, None, 0)
+        return {'count': len(identifiers)}
+
+    def upsert_one(self, authenticated_user, graphql_path, graphql_selection=None, _=None, depth=0,
+            **key):
+        # exactly one unique field identifies the instance
+        if len(key) != 1:
+            raise exceptions.ValidationError([{
+                'path': graphql_path,
+                'message': 'Exactly one unique field must be provided.',
+                'params': {'fields': sorted(self.fields_info.unique)},
+                'code': 'upsert_key',
+            }])
+        key_field_name = next(iter(key))
+        # insert or update
+        instance, = self._upsert_instances(
+            authenticated_user = authenticated_user,
+            graphql_paths = [graphql_path],
+            key_field_name = key_field_name,
+            items = [dict(_ or {}, **key)],
+            depth = depth)
+        # result
+        if graphql_selection is None:
+            return instance
+        self._prefetch_for_selection(
+            instances = [instance],
+            graphql_selection = graphql_selection,
+            authenticated_user = authenticated_user)
+        return self._instance_to_dict(
+            authenticated_user = authenticated_user,
+            instance = instance,
+            graphql_selection = graphql_selection,
+            graphql_path = graphql_path,
+            ensure_permission = True,
+        )
+
+    def upsert_many(self, authenticated_user, graphql_path, graphql_selection=None, key=None, items=None,
+            depth=0):
+        items_path = graphql_path + ['items']
+        items = items or ()
+        # insert or update
+        instances = self._upsert_instances(
+            authenticated_user = authenticated_user,
+            graphql_paths = [items_path + [index] for index in range(len(items))],
+            key_field_name = key,
+            items = items,
+            depth = depth)
+        # result, in the same order as the input
+        if graphql_selection is None:
+            return instances
+        self._prefetch_for_selection(
+            instances = instances,
+            graphql_selection = graphql_selection,
+            authenticated_user = authenticated_user)
+        return [
+            self._instance_to_dict(
+                authenticated_user = authenticated_user,
+                instance = instance,
+                graphql_selection = graphql_selection,
+                graphql_path = items_path + [index],
+                ensure_permission = True,
+            )
+            for index, instance in enumerate(instances)
+        ]
+
+    # methods should be executed within an atomic database transaction
+
+    def decorate(self, method, graphql_path=None, retry=True):
+        """
+            Every exposed method will have to go through this decorator.
+
+            When `retry` is `True` (for mutations) and the transaction fails because of
+            a lock or a serialization conflict with a concurrent transaction, it is run
+            again after a jittered exponential backoff, up to the `transactions_max_retries`
+            option of the schema. This only applies when the method is not called within
+            an outer transaction.
+        """
+        def run(args, kwargs):
+            with django.db.transaction.atomic():
+                try:
+                    return method(*args, **kwargs)
+                except django.core.exceptions.ValidationError as exception:
+                    reraise_from_django_validation_error(
+                        graphql_path or kwargs['graphql_path'], exception)
+        if not retry:
+            return lambda *args, **kwargs: run(args, kwargs)
+        def decorated(*args, **kwargs):
+            schema = self.model_config.schema
+            # within an outer transaction, a retry cannot fix anything
+            can_retry = (schema.transactions_max_retries > 0
+                and not django.db.transaction.get_connection().in_atomic_block)
+            attempt = 0
+            attempt_kwargs = kwargs
+            while True:
+                try:
+                    return run(args, attempt_kwargs)
+                except django.db.OperationalError as exception:
+                    if not can_retry or not is_retryable_error(exception):
+                        raise
+                    if attempt >= schema.transactions_max_retries:
+                        schema.stats['transactions_retries_exhausted'] += 1
+                        raise
+                    attempt += 1
+                    schema.stats['transactions_retries'] += 1
+                    time.sleep(get_retry_delay(attempt,
+                        schema.transactions_retry_base_delay, schema.transactions_retry_max_delay))
+                    # methods leave their arguments untouched, but a retry never shares them
+                    attempt_kwargs = {
+                        name: value if name == 'authenticated_user' else copy.deepcopy(value)
+                        for name, value in kwargs.items()
+                    }
+        return decorated
+
+    # document-level transactions
+
+    @staticmethod
+    def atomic_document():
+        return atomic_document()
+
+    @staticmethod
+    def _clean_related(instance, graphql_path):
+        """
+            Cross-object validation of `instance` (raise an easy_graphql_server exception
+            instead of a Django one); it is deferred to the end of the document when
+            performed within a document-level transaction.
+        """
+        if not callable(getattr(instance, 'clean_related', None)):
+            return
+        document = get_atomic_document()
+        if document is not None:
+            document.defer_clean_related(instance, graphql_path)
+            return
+        try:
+            instance.clean_related()
+        except django.core.exceptions.ValidationError as exception:
+            reraise_from_django_validation_error(
+                graphql_path, exception)
+
+    # post-commit triggers
+
+    def _on_after_commit(self, instance, authenticated_user, operation, data, depth):
+        """
+            Schedule post-commit trigger(s) for given instance; they are run by the
+            schema's background executor once the current transaction is committed,
+            and are discarded if it is rolled back.
+        """
+        callbacks = self.model_config.callbacks['on_after_commit']
+        if not callbacks:
+            return
+        executor = self.model_config.schema.after_commit_executor
+        for callback in callbacks:
+            django.db.transaction.on_commit(
+                functools.partial(executor.submit, _call_after_commit,
+                    callback, instance, authenticated_user, operation, data, depth,
+                    close_connections = not executor.synchronous),
+                using = self.orm_model.objects.db)
+
+    # helpers for creation
+
+    def _prepare_creation(self, authenticated_user, graphql_path, ensure_permission, depth, data):
+        """
+            Build an unsaved instance from `data`, which is altered in place.
+
+            Foreign instances are created on the way; returns the instance, and the data
+            for related instances, to be created once the instance is saved.
+        """
+        # related things
+        related_data = {}
+        for field_name in list(data.keys()):
+            if field_name in self.fields_info.foreign:
+                foreign_instance = self.get_linked_manager(field_name).create_one(
+                    authenticated_user = authenticated_user,
+                    graphql_path = graphql_path + [field_name],
+                    ensure_permission = False,
+                    depth = depth + 1,
+                    **data.pop(field_name))
+                data[field_name] = foreign_instance
+            elif field_name in self.fields_info.related:
+                related_data[field_name] = data.pop(field_name)
+        # extract data for custom fields
+        custom_fields_data = self._extract_custom_fields_data(
+            operation = Operation.CREATE,
+            data = data)
+        # instance itself
+        instance = self.orm_model(**data)
+        # custom fields definition
+        self._create_custom_fields(
+            instance = instance,
+            authenticated_user = authenticated_user,
+            data = custom_fields_data)
+        # pre-save trigger
+        self.model_config.on_before_operation(instance, authenticated_user, Operation.CREATE, data, depth)
+        # enforce permissions
+        if ensure_permission:
+            self.model_config.ensure_permission(
+                operation = Operation.CREATE,
+                instance = instance,
+                authenticated_user = authenticated_user,
+                graphql_path = graphql_path,
+                data = data,
+            )
+        return instance, related_data
+
+    def _complete_creation(self, instance, related_data, authenticated_user, graphql_path, depth, data):
+        """
+            Create related instances for a freshly saved instance, then run the
+            post-save trigger.
+        """
+        # related data, created by batches (the foreign key is set before insertion)
+        for field_name, children_data in related_data.items():
+            related_field = self.fields_info.related[field_name]
+            self.get_linked_manager(field_name)._create_instances( # pylint: disable=protected-access
+                authenticated_user = authenticated_user,
+                graphql_paths = [
+                    graphql_path + [field_name, child_index]
+                    for child_index in range(len(children_data))
+                ],
+                items = [
+                    dict(child_data, **{related_field.value_field_name: instance.pk})
+                    for child_data in children_data
+                ],
+                ensure_permission = False,
+                depth = depth + 1)
+        # validation
+        self._clean_related(instance, graphql_path)
+        # post-save trigger
+        self.model_config.on_after_operation(instance, authenticated_user, Operation.CREATE, data, depth)
+        self._on_after_commit(instance, authenticated_user, Operation.CREATE, data, depth)
+
+    def _create_instances(self, authenticated_user, graphql_paths, items, ensure_permission, depth, *,
+            unique_excludes=()):
+        """
+            Create one instance per `dict` in `items`: all instances are prepared and
+            validated first, then inserted together, then completed with their
+            related data.
+
+            `graphql_paths` gives the path of each item in the GraphQL input; the
+            uniqueness of fields in `unique_excludes` is left to the database.
+
+            Returns the list of created instances, in the same order as `items`.
+        """
+        # instances, with related things
+        creations = []
+        for item_path, data in zip(graphql_paths, items):
+            data = dict(data)
+            instance, related_data = self._prepare_creation(
+                authenticated_user = authenticated_user,
+                graphql_path = item_path,
+                ensure_permission = ensure_permission,
+                depth = depth,
+                data = data)
+            creations.append((instance, related_data, data))
+        instances = [instance for instance, _, _ in creations]
+        # validation of all instances, before anything is saved
+        self._validate_instances(
+            instances = instances,
+            graphql_paths = graphql_paths,
+            unique_excludes = unique_excludes)
+        # save
+        self._insert_instances(instances)
+        # related data, validation & post-save trigger
+        for item_path, (instance, related_data, data) in zip(graphql_paths, creations):
+            self._complete_creation(
+                instance = instance,
+                related_data = related_data,
+                authenticated_user = authenticated_user,
+                graphql_path = item_path,
+                depth = depth,
+                data = data)
+        return instances
+
+    def _validate_instances(self, instances, graphql_paths, validate_unique=True, unique_excludes=()):
+        """
+            Validate all given instances, and raise a single `ValidationError` gathering
+            the issues of every instance.
+
+            Uniqueness of single fields is checked for all instances at once, see
+            `_get_unique_errors()`, except for fields in `unique_excludes`.
+        """
+        instances_issues = []
+        excludes = []
+        for instance, graphql_path in zip(instances, graphql_paths):
+            try:
+                instance.full_clean(validate_unique=False)
+            except django.core.exceptions.ValidationError as exception:
+                instances_issues.append(serialize_django_validation_error(graphql_path, exception))
+                # like `full_clean()`, uniqueness is not checked for invalid fields
+                excludes.append(set(getattr(exception, 'error_dict', ())).union(unique_excludes))
+            else:
+                instances_issues.append([])
+                excludes.append(set(unique_excludes))
+        if validate_unique:
+            unique_errors = self._get_unique_errors(instances, excludes)
+            for instance_issues, graphql_path, errors in zip(instances_issues, graphql_paths, unique_errors):
+                if errors:
+                    instance_issues += serialize_django_validation_error(
+                        graphql_path, django.core.exceptions.ValidationError(errors))
+        issues = [issue for instance_issues in instances_issues for issue in instance_issues]
+        if issues:
+            raise exceptions.ValidationError(issues)
+
+    @staticmethod
+    def _get_unique_errors(instances, excludes):
+        """
+            Check uniqueness constraints for given instances, ignoring the fields in
+            `excludes` (one `set` per instance).
+
+            Single unique fields are checked with one query per field for all instances,
+            and values provided more than once are detected in memory; other checks
+            (e.g. `unique_together`) are left to Django, instance by instance.
+
+            Returns a list of errors `dict` (one per instance), as expected by Django's
+            `ValidationError`.
+        """
+        # pylint: disable=protected-access
+        errors = [defaultdict(list) for _ in instances]
+        # values to check, indexed by model & field
+        occurrences = defaultdict(list)
+        for index, (instance, exclude) in enumerate(zip(instances, excludes)):
+            unique_checks, date_checks = instance._get_unique_checks(exclude=exclude)
+            other_checks = []
+            for model_class, unique_check in unique_checks:
+                if len(unique_check) > 1:
+                    other_checks.append((model_class, unique_check))
+                    continue
+                field = model_class._meta.get_field(unique_check[0])
+                value = getattr(instance, field.attname)
+                connection = django.db.connections[django.db.router.db_for_read(model_class)]
+                if value is None or (value == '' and connection.features.interprets_empty_strings_as_nulls):
+                    continue
+                if field.primary_key and not instance._state.adding:
+                    continue
+                occurrences[model_class, field].append((index, value))
+            for field_name, field_errors in dict(
+                    instance._perform_unique_checks(other_checks),
+                    **instance._perform_date_checks(date_checks)).items():
+                errors[index][field_name] += field_errors
+        # batched checks
+        for (model_class, field), field_occurrences in occurrences.items():
+            # values provided more than once
+            first_indexes = {}
+            for index, value in field_occurrences:
+                if value in first_indexes:
+                    errors[index][field.name].append(django.core.exceptions.ValidationError(
+                        message = 'This value is provided more than once.',
+                        code = 'unique',
+                        params = {'value': value}))
+                else:
+                    first_indexes[value] = index
+            # values already used by other instances in database
+            values = list(first_indexes)
+            existing = defaultdict(set)
+            for offset in range(0, len(values), DEFAULT_CHUNK_SIZE):
+                for value, primary_key in model_class._default_manager.filter(**{
+                        f'{field.name}__in': values[offset : offset + DEFAULT_CHUNK_SIZE]
+                        }).values_list(field.name, 'pk'):
+                    existing[value].add(primary_key)
+            # the database may compare values differently (e.g. case-insensitive collation)
+            compared_differently = any(
+                existing_value not in first_indexes for existing_value in existing)
+            for value, index in first_indexes.items():
+                instance = instances[index]
+                if compared_differently:
+                    for field_name, field_errors in instance._perform_unique_checks(
+                            [(model_class, (field.name,))]).items():
+                        errors[index][field_name] += field_errors
+                    continue
+                primary_key = instance._get_pk_val(model_class._meta)
+                others = existing.get(value, set())
+                if not instance._state.adding and primary_key is not None:
+                    others = others - {primary_key}
+                if others:
+                    errors[index][field.name].append(
+                        instance.unique_error_message(model_class, (field.name,)))
+        return [dict(instance_errors) for instance_errors in errors]
+
+    def _can_bulk_insert(self):
+        """
+            Tell whether instances can be inserted with `bulk_create()`, i.e. without
+            any behaviour of `Model.save()` being skipped.
+        """
+        # pylint: disable=protected-access
+        connection = django.db.connections[django.db.router.db_for_write(self.orm_model)]
+        return (
+            # primary keys are needed afterwards, for related data & results
+            connection.features.can_return_rows_from_bulk_insert
+            # multi-table inheritance is not supported by `bulk_create()`
+            and not self.orm_model._meta.parents
+            # nothing would be triggered by `save()`
+            and self._saves_without_side_effects()
+        )
+
+    def _insert_instances(self, instances):
+        """
+            Save new, already validated instances; use batched inserts when possible.
+        """
+        if self._can_bulk_insert():
+            self.orm_model.objects.bulk_create(
+                instances, batch_size=self.model_config.batch_size)
+        else:
+            for instance in instances:
+                instance.save()
+
+    # helpers for update
+
+    def _update_instance(self, instance, authenticated_user, graphql_path, depth, data,
+            expected_version=None):
+        """
+            Apply `data` to an existing instance, including linked & custom fields,
+            with permissions check, validation & triggers.
+
+            Only changed fields are validated and saved; the instance is not saved at all
+            when nothing changed.
+
+            When the model has a version field, a `ConflictError` is raised if the
+            instance is not at `expected_version` (when given), or if it was modified
+            since it was read.
+
+            `data` is left untouched.
+        """
+        data = dict(data)
+        # loaded values, to later determine what changed
+        initial_values = self._get_loaded_values(instance)
+        # optimistic concurrency control
+        version_field = self.model_config.version_field
+        if version_field and expected_version is not None:
+            current_version = getattr(instance, version_field)
+            if current_version != expected_version:
+                raise exceptions.ConflictError(graphql_path, expected_version, current_version)
         # enforce permissions
         self.model_config.ensure_permission(
             operation = Operation.UPDATE,
@@ -230,26 +909,24 @@ class DjangoModelManager(ModelManager):
                 child_data = data.pop(field_name)
                 # if child_data is null, the reference will be deleted
                 if child_data is not None:
-                    child_model_config = self.model_config.schema.get_model_config(
-                        orm_model = self.fields_info.foreign[field_name].orm_model)
-                    child_identifier = child_data.pop(
-                        child_model_config.orm_model_manager.fields_info.primary, None)
+                    child_data = dict(child_data)
+                    child_manager = self.get_linked_manager(field_name)
+                    child_identifier = child_data.pop(child_manager.fields_info.primary, None)
                     # if no identifier provided, create a new instance
                     if child_identifier is None:
-                        data[field_name] = child_model_config.orm_model_manager.create_one(
+                        data[field_name] = child_manager.create_one(
                             authenticated_user = authenticated_user,
                             graphql_path = graphql_path + [field_name],
                             depth = depth + 1,
                             **child_data)
                     # if identifier provided, update existing instance
                     else:
-                        data[field_name] = child_model_config.orm_model_manager.update_one(
+                        data[field_name] = child_manager.update_one(
                             authenticated_user = authenticated_user,
                             graphql_path = graphql_path + [field_name],
                             _ = child_data,
                             depth = depth + 1,
-                            **{child_model_config.orm_model_manager.fields_info.primary:
-                                child_identifier})
+                            **{child_manager.fields_info.primary: child_identifier})
             # related fields
             elif field_name in self.fields_info.related:
                 related_data[field_name] = data.pop(field_name)
@@ -267,126 +944,554 @@ class DjangoModelManager(ModelManager):
             data = custom_fields_data)
         # validate & save (raise an easy_graphql_server exception instead of a Django one)
         try:
-            # validation
-            instance.full_clean()
-            # save instance
-            instance.save()
+            # validation of changed fields only
+            instance.full_clean(exclude=self._get_unchanged_fields_names(
+                instance, initial_values))
+            # save changed fields only
+            changed_fields_names = self._get_changed_fields_names(instance, initial_values)
+            if changed_fields_names:
+                update_fields_names = changed_fields_names | self._get_auto_now_fields_names()
+                if version_field:
+                    self._save_versioned(instance, update_fields_names, graphql_path)
+                else:
+                    instance.save(update_fields=update_fields_names)
         except django.core.exceptions.ValidationError as exception:
             reraise_from_django_validation_error(
                 graphql_path, exception)
         # related data
         for field_name, children_data in related_data.items():
-            related_field = self.fields_info.related[field_name]
-            child_model_config = self.model_config.schema.get_model_config(
-                orm_model = related_field.orm_model)
-            children_identifiers = []
-            # create & update
-            for child_index, child_data in enumerate(children_data):
-                child_identifier = child_data.get(
-                    child_model_config.orm_model_manager.fields_info.primary, None)
-                # update only if identifier provided
-                if child_identifier is not None:
-                    child_instance = child_model_config.orm_model_manager.update_one(
-                        authenticated_user = authenticated_user,
-                        graphql_path = graphql_path + [field_name, child_index],
-                        _ = child_data,
-                        depth = depth + 1,
-                        **{child_model_config.orm_model_manager.fields_info.primary:
-                            child_identifier})
-                    # store identifier
-                    children_identifiers.append(child_identifier)
-            # delete omitted children
-            for child_instance in getattr(instance, field_name).all():
-                if child_instance.pk not in children_identifiers:
-                    child_instance.delete()
-            # create
-            for child_index, child_data in enumerate(children_data):
-                child_identifier = child_data.get(
-                    child_model_config.orm_model_manager.fields_info.primary, None)
-                # create only if no identifier provided
-                if child_identifier is None:
-                    child_instance = child_model_config.orm_model_manager.create_one(
-                        authenticated_user = authenticated_user,
-                        graphql_path = graphql_path + [field_name, child_index],
-                        depth = depth + 1,
-                        **dict({related_field.value_field_name: instance.pk}, **child_data))
-                    getattr(instance, field_name).add(child_instance)
-        # validation (raise an easy_graphql_server exception instead of a Django one)
+            self._synchronize_children(
+                instance = instance,
+                field_name = field_name,
+                children_data = children_data,
+                authenticated_user = authenticated_user,
+                graphql_path = graphql_path,
+                depth = depth)
+        # validation
+        self._clean_related(instance, graphql_path)
+        # post-update trigger
+        self.model_config.on_after_operation(instance, authenticated_user, Operation.UPDATE, data, depth)
+        self._on_after_commit(instance, authenticated_user, Operation.UPDATE, data, depth)
+
+    def _save_versioned(self, instance, update_fields_names, graphql_path):
+        """
+            Save `instance` only if its version in database is still the one that was
+            read, and increment it; otherwise, raise a `ConflictError`.
+        """
+        # pylint: disable=protected-access
+        version_field = self.model_config.version_field
+        current_version = getattr(instance, version_field)
+        queryset = self.orm_model.objects.filter(pk=instance.pk, **{version_field: current_version})
+        # when saving has no side effect, everything is written in a single query...
+        if self._saves_without_side_effects():
+            for field_name, value in self._get_auto_now_values().items():
+                setattr(instance, field_name, value)
+            values = {
+                self.orm_model._meta.get_field(field_name).attname:
+                    getattr(instance, self.orm_model._meta.get_field(field_name).attname)
+                for field_name in update_fields_names
+            }
+            values[version_field] = current_version + 1
+            updated = queryset.update(**values)
+        # ...otherwise the version is incremented first, then the instance is saved
+        else:
+            updated = queryset.update(**{version_field: current_version + 1})
+        if not updated:
+            raise exceptions.ConflictError(graphql_path, current_version,
+                self.orm_model.objects.filter(pk=instance.pk).values_list(
+                    version_field, flat=True).first())
+        setattr(instance, version_field, current_version + 1)
+        if not self._saves_without_side_effects():
+            instance.save(update_fields=update_fields_names)
+
+    def _get_bulk_update_values(self, graphql_path, data):
+        """
+            Values to pass to `QuerySet.update()` to apply `data`, including fields
+            automatically set on save, and incremented version.
+        """
         try:
-            instance.full_clean()
-            if callable(getattr(instance, 'clean_related', None)):
-                instance.clean_related()
+            values = self._clean_bulk_update_values(data)
         except django.core.exceptions.ValidationError as exception:
             reraise_from_django_validation_error(
                 graphql_path, exception)
-        # post-update trigger
-        self.model_config.on_after_operation(instance, authenticated_user, Operation.UPDATE, data, depth)
-        # result
-        if graphql_selection is None:
-            return instance
-        return self._instance_to_dict(
+        if values:
+            values = dict(self._get_auto_now_values(), **values)
+            if self.model_config.version_field:
+                values[self.model_config.version_field] = (
+                    django.db.models.F(self.model_config.version_field) + 1)
+        return values
+
+    def _get_chunks(self, identifiers):
+        """
+            Split `identifiers` in lists of at most `batch_size` items, to keep the
+            number of parameters of `pk__in` queries bounded.
+        """
+        chunk_size = self.model_config.batch_size or DEFAULT_CHUNK_SIZE
+        max_query_params = django.db.connections[self.orm_model.objects.db].features.max_query_params
+        if max_query_params is not None:
+            chunk_size = min(chunk_size, max_query_params)
+        for offset in range(0, len(identifiers), chunk_size):
+            yield identifiers[offset : offset + chunk_size]
+
+    def _claim_one_by_one(self, candidates, limit):
+        """
+            Claim up to `limit` instances from `candidates` without `SKIP LOCKED`: every
+            instance is locked on its own, then claimed only if it still matches the
+            filters, i.e. if no concurrent claim got it first.
+        """
+        instances = []
+        excluded_identifiers = []
+        while len(instances) < limit:
+            identifiers = list(candidates
+                .exclude(pk__in=excluded_identifiers)
+                .values_list('pk', flat=True)[:limit - len(instances)])
+            if not identifiers:
+                break
+            excluded_identifiers += identifiers
+            for identifier in identifiers:
+                instance = candidates.select_for_update().filter(pk=identifier).first()
+                if instance is not None:
+                    instances.append(instance)
+        return instances
+
+    def _get_loaded_values(self, instance):
+        """
+            Copy of the loaded field values of `instance`, by attribute name; deferred
+            fields are ignored, so that they are not loaded.
+        """
+        # pylint: disable=protected-access
+        values = {}
+        for field in self.orm_model._meta.concrete_fields:
+            if field.attname in instance.__dict__:
+                value = instance.__dict__[field.attname]
+                # mutable values (e.g. from JSON fields) could be altered in place
+                if isinstance(value, (dict, list)):
+                    value = copy.deepcopy(value)
+                values[field.attname] = value
+        return values
+
+    def _get_changed_fields_names(self, instance, initial_values):
+        """
+            Names of the fields of `instance` whose value differs from `initial_values`.
+        """
+        # pylint: disable=protected-access
+        return {
+            field.name
+            for field in self.orm_model._meta.concrete_fields
+            if field.attname in instance.__dict__ and (
+                field.attname not in initial_values
+                or instance.__dict__[field.attname] != initial_values[field.attname]
+            )
+        }
+
+    def _get_unchanged_fields_names(self, instance, initial_values):
+        """
+            Names of the fields of `instance` that do not need to be validated again.
+
+            Unchanged fields sharing a uniqueness constraint with a changed field are
+            not included, so that the constraint is still checked.
+        """
+        # pylint: disable=protected-access
+        changed_fields_names = self._get_changed_fields_names(instance, initial_values)
+        unchanged_fields_names = {
+            field.name
+            for field in self.orm_model._meta.fields
+        } - changed_fields_names
+        for fields_names in self.orm_model._meta.unique_together:
+            if changed_fields_names & set(fields_names):
+                unchanged_fields_names -= set(fields_names)
+        for constraint in self.orm_model._meta.total_unique_constraints:
+            if changed_fields_names & set(constraint.fields):
+                unchanged_fields_names -= set(constraint.fields)
+        return list(unchanged_fields_names)
+
+    def _get_auto_now_fields_names(self):
+        # pylint: disable=protected-access
+        return {
+            field.name
+            for field in self.orm_model._meta.concrete_fields
+            if getattr(field, 'auto_now', False)
+        }
+
+    def _synchronize_children(self, instance, field_name, children_data, authenticated_user,
+            graphql_path, depth):
+        """
+            Make the children of `instance` for the related field `field_name` match
+            `children_data`: children with an identifier are updated, children without
+            one are created, and omitted children are deleted.
+
+            Current children are loaded with a single query; then deletions, updates
+            and creations are performed by batches whenever possible.
+        """
+        # pylint: disable=protected-access
+        related_field = self.fields_info.related[field_name]
+        child_manager = self.get_linked_manager(field_name)
+        child_model_config = child_manager.model_config
+        primary = child_manager.fields_info.primary
+        # current children
+        existing_children = {
+            child_instance.pk: child_instance
+            for child_instance in getattr(instance, field_name).all()
+        }
+        # plan what has to be done
+        kept_identifiers = set()
+        bulk_updates = []
+        single_updates = []
+        creations = []
+        for child_index, child_data in enumerate(children_data):
+            child_path = graphql_path + [field_name, child_index]
+            child_data = dict(child_data)
+            child_identifier = child_data.pop(primary, None)
+            if child_identifier is None:
+                child_data[related_field.value_field_name] = instance.pk
+                creations.append((child_index, child_data))
+                continue
+            kept_identifiers.add(child_identifier)
+            child_instance = existing_children.get(child_identifier)
+            if (child_instance is not None and not child_model_config.callbacks['filter_for_user']
+                    and not child_model_config.version_field
+                    and child_manager._can_bulk_update(child_data)):
+                bulk_updates.append((child_instance, child_path, child_data))
+            else:
+                single_updates.append((child_identifier, child_path, child_data))
+        # update, in a single query for simple cases...
+        child_manager._bulk_update_instances(bulk_updates)
+        # ...or one by one
+        for child_identifier, child_path, child_data in single_updates:
+            child_manager.update_one(
+                authenticated_user = authenticated_user,
+                graphql_path = child_path,
+                _ = child_data,
+                depth = depth + 1,
+                **{primary: child_identifier})
+        # delete omitted children
+        omitted_children = [
+            child_instance
+            for child_identifier, child_instance in existing_children.items()
+            if child_identifier not in kept_identifiers
+        ]
+        if child_manager.orm_model.delete is django.db.models.Model.delete:
+            if omitted_children:
+                child_manager.orm_model.objects.filter(
+                    pk__in = [child_instance.pk for child_instance in omitted_children]).delete()
+        else:
+            for child_instance in omitted_children:
+                child_instance.delete()
+        # create
+        child_manager._create_instances(
             authenticated_user = authenticated_user,
-            instance = instance,
-            graphql_selection = graphql_selection,
-            graphql_path = graphql_path,
+            graphql_paths = [graphql_path + [field_name, child_index] for child_index, _ in creations],
+            items = [child_data for _, child_data in creations],
             ensure_permission = True,
-        )
+            depth = depth + 1)
+        # children prefetched when reading the instance are now outdated
+        getattr(instance, field_name)._remove_prefetched_objects()
 
-    def delete_one(self, authenticated_user, graphql_path, graphql_selection, **filters):
-        instance = self._read_one(
-            graphql_selection = graphql_selection,
-            authenticated_user = authenticated_user,
-            **filters
-        )
-        self.model_config.ensure_permission(
-            operation = Operation.DELETE,
-            instance = instance,
-            authenticated_user = authenticated_user,
-            graphql_path = graphql_path,
+    def _bulk_update_instances(self, updates):
+        """
+            Apply new data to existing instances with `QuerySet.bulk_update()`, only
+            writing columns that actually changed.
+
+            `updates` is a list of `(instance, graphql_path, data)` tuples, where `data`
+            passed `_can_bulk_update()`.
+        """
+        issues = []
+        changed_instances = []
+        changed_fields_names = set()
+        for instance, graphql_path, data in updates:
+            try:
+                values = self._clean_bulk_update_values(data)
+            except django.core.exceptions.ValidationError as exception:
+                issues += serialize_django_validation_error(graphql_path, exception)
+                continue
+            changed_values = {
+                field_name: value
+                for field_name, value in values.items()
+                if getattr(instance, field_name) != value
+            }
+            if changed_values:
+                changed_values.update(self._get_auto_now_values())
+                for field_name, value in changed_values.items():
+                    setattr(instance, field_name, value)
+                changed_instances.append(instance)
+                changed_fields_names |= set(changed_values)
+        if issues:
+            raise exceptions.ValidationError(issues)
+        if changed_instances:
+            self.orm_model.objects.bulk_update(
+                changed_instances,
+                fields = sorted(changed_fields_names),
+                batch_size = self.model_config.batch_size)
+
+    def _can_bulk_update(self, data):
+        """
+            Tell whether `data` can be applied with a single `QuerySet.update()`,
+            i.e. without skipping any instance-level behaviour.
+        """
+        # pylint: disable=protected-access
+        callbacks = self.model_config.callbacks
+        if any(callbacks[callback_name] for callback_name in (
+                'has_permission', 'on_before_operation', 'on_after_operation', 'on_after_commit')):
+            return False
+        if not self._saves_without_side_effects():
+            return False
+        if (self.orm_model.clean is not django.db.models.Model.clean
+                or callable(getattr(self.orm_model, 'clean_related', None))):
+            return False
+        # unique values would have to be checked instance by instance
+        unique_fields_names = set()
+        for fields_names in self.orm_model._meta.unique_together:
+            unique_fields_names |= set(fields_names)
+        for constraint in self.orm_model._meta.total_unique_constraints:
+            unique_fields_names |= set(constraint.fields)
+        for field_name in data:
+            if field_name in self.fields_info.linked or field_name in self.fields_info.custom:
+                return False
+            field = self.orm_model._meta.get_field(field_name)
+            if field.unique or field.name in unique_fields_names:
+                return False
+        return True
+
+    def _clean_bulk_update_values(self, data):
+        """
+            Validate & convert `data` for `QuerySet.update()` or `QuerySet.bulk_update()`,
+            field by field.
+
+            Raises a Django `ValidationError` mapping field names to errors.
+        """
+        # pylint: disable=protected-access
+        values = {}
+        errors = {}
+        for field_name, value in data.items():
+            field = self.orm_model._meta.get_field(field_name)
+            try:
+                values[field.attname] = field.clean(value, None)
+            except django.core.exceptions.ValidationError as error:
+                errors[field.name] = error.error_list
+        if errors:
+            raise django.core.exceptions.ValidationError(errors)
+        return values
+
+    def _get_auto_now_values(self):
+        """
+            Values of fields with `auto_now`, as `save()` would set them.
+        """
+        # pylint: disable=protected-access
+        values = {}
+        for field in self.orm_model._meta.concrete_fields:
+            if getattr(field, 'auto_now', False):
+                if isinstance(field, django.db.models.DateTimeField):
+                    values[field.attname] = django.utils.timezone.now()
+                elif isinstance(field, django.db.models.DateField):
+                    values[field.attname] = datetime.date.today()
+                else:
+                    values[field.attname] = datetime.datetime.now().time()
+        return values
+
+    def _saves_without_side_effects(self):
+        """
+            Tell whether nothing would be triggered by `Model.save()`, apart from
+            the actual query.
+        """
+        return (
+            self.orm_model.save is django.db.models.Model.save
+            and not django.db.models.signals.pre_save.has_listeners(self.orm_model)
+            and not django.db.models.signals.post_save.has_listeners(self.orm_model)
         )
-        # keep primary key for later result
-        if self.fields_info.primary in graphql_selection:
-            pre_result = {self.fields_info.primary: getattr(instance, self.fields_info.primary)}
-        else:
-            pre_result = {}
-        # actually perform operations
-        self.model_config.on_before_operation(instance, authenticated_user, Operation.DELETE, None, 0)
-        instance.delete()
-        self.model_config.on_after_operation(instance, authenticated_user, Operation.DELETE, None, 0)
-        # compute & return result
-        result = self._instance_to_dict(
+
+    # helpers for deletion
+
+    def _can_bulk_delete(self):
+        """
+            Tell whether instances can be deleted with a queryset, i.e. without skipping
+            any instance-level behaviour.
+        """
+        callbacks = self.model_config.callbacks
+        if any(callbacks[callback_name] for callback_name in (
+                'has_permission', 'on_before_operation', 'on_after_operation', 'on_after_commit')):
+            return False
+        return self.orm_model.delete is django.db.models.Model.delete
+
+    # helpers for upsert
+
+    def _upsert_instances(self, authenticated_user, graphql_paths, key_field_name, items, depth):
+        """
+            Create or update one instance per `dict` in `items`, depending on whether an
+            instance exists with the same value for the unique field `key_field_name`.
+
+            Returns the list of instances, in the same order as `items`.
+        """
+        # key values must be provided, and distinct
+        issues = []
+        key_values = set()
+        for graphql_path, data in zip(graphql_paths, items):
+            key_value = data.get(key_field_name)
+            if key_value is None:
+                issues.append({
+                    'path': graphql_path + [key_field_name],
+                    'message': 'This field cannot be null.',
+                    'params': {},
+                    'code': 'null',
+                })
+            elif key_value in key_values:
+                issues.append({
+                    'path': graphql_path + [key_field_name],
+                    'message': 'This value is provided more than once.',
+                    'params': {'value': key_value},
+                    'code': 'unique',
+                })
+            key_values.add(key_value)
+        if issues:
+            raise exceptions.ValidationError(issues)
+        # single query when possible
+        if self._can_upsert_natively(key_field_name, items):
+            return self._upsert_natively(graphql_paths, key_field_name, items)
+        # otherwise, update existing instances, and create the other ones
+        instances = [None] * len(items)
+        creations = list(zip(range(len(items)), graphql_paths, items))
+        existing_instances = self._lock_existing_instances(
             authenticated_user = authenticated_user,
-            instance = instance,
-            graphql_selection = graphql_selection,
-            graphql_path = graphql_path,
-            ensure_permission = False,
-        )
-        result.update(pre_result)
-        return result
+            key_field_name = key_field_name,
+            key_values = key_values)
+        while creations:
+            remaining_creations = []
+            for index, graphql_path, data in creations:
+                instance = existing_instances.get(data[key_field_name])
+                if instance is None:
+                    remaining_creations.append((index, graphql_path, data))
+                    continue
+                self._update_instance(
+                    instance = instance,
+                    authenticated_user = authenticated_user,
+                    graphql_path = graphql_path,
+                    depth = depth,
+                    data = data)
+                instances[index] = instance
+            creations = remaining_creations
+            if not creations:
+                break
+            # keys inserted by a concurrent transaction in the meantime are not locked,
+            # so the insertion is rolled back to a savepoint, then retried as an update
+            try:
+                with django.db.transaction.atomic():
+                    created_instances = self._create_instances(
+                        authenticated_user = authenticated_user,
+                        graphql_paths = [graphql_path for _, graphql_path, _ in creations],
+                        items = [data for _, _, data in creations],
+                        ensure_permission = True,
+                        depth = depth,
+                        # a concurrent insertion must fail in the database, to be retried
+                        unique_excludes = {key_field_name})
+            except django.db.IntegrityError:
+                existing_instances = self._lock_existing_instances(
+                    authenticated_user = authenticated_user,
+                    key_field_name = key_field_name,
+                    key_values = [data[key_field_name] for _, _, data in creations])
+                # the failure was not caused by a concurrent insertion
+                if not existing_instances:
+                    raise
+                continue
+            for (index, _, _), instance in zip(creations, created_instances):
+                instances[index] = instance
+            break
+        return instances
 
-    # methods should be executed within an atomic database transaction
+    def _lock_existing_instances(self, authenticated_user, key_field_name, key_values):
+        """
+            Lock the instances having one of `key_values` for the unique field
+            `key_field_name`, restricted to those that can be seen by the user.
 
-    def decorate(self, method, graphql_path=None):
+            Returns them as a `dict`, indexed by key value.
         """
-            Every exposed method will have to go through this decorator.
+        existing_instances = {
+            getattr(instance, key_field_name): instance
+            for instance in self.orm_model.objects.select_for_update().filter(
+                **{f'{key_field_name}__in': key_values})
+        }
+        if self.model_config.callbacks['filter_for_user']:
+            visible_identifiers = set(self.model_config.filter_for_user(
+                queryset = self.orm_model.objects.filter(
+                    pk__in = [instance.pk for instance in existing_instances.values()]),
+                authenticated_user = authenticated_user,
+            ).values_list('pk', flat=True))
+            existing_instances = {
+                key_value: instance
+                for key_value, instance in existing_instances.items()
+                if instance.pk in visible_identifiers
+            }
+        return existing_instances
+
+    def _can_upsert_natively(self, key_field_name, items):
         """
-        def decorated(*args, **kwargs):
-            with django.db.transaction.atomic():
-                try:
-                    return method(*args, **kwargs)
-                except django.core.exceptions.ValidationError as exception:
-                    reraise_from_django_validation_error(
-                        graphql_path or kwargs['graphql_path'], exception)
-        return decorated
+            Tell whether `items` can be upserted with `INSERT ... ON CONFLICT`, i.e.
+            without skipping any instance-level behaviour.
+        """
+        # pylint: disable=protected-access
+        if not supports_native_upsert(self.orm_model) or self.model_config.version_field:
+            return False
+        callbacks = self.model_config.callbacks
+        if any(callbacks[callback_name] for callback_name in (
+                'has_permission', 'filter_for_user',
+                'on_before_operation', 'on_after_operation', 'on_after_commit')):
+            return False
+        if self.orm_model._meta.parents or not self._saves_without_side_effects():
+            return False
+        if callable(getattr(self.orm_model, 'clean_related', None)):
+            return False
+        # the key must be the only possible conflict
+        if self.orm_model._meta.unique_together or self.orm_model._meta.total_unique_constraints:
+            return False
+        for field in self.orm_model._meta.concrete_fields:
+            if field.unique and not field.primary_key and key_field_name not in (field.name, field.attname):
+                return False
+        # only value fields
+        for data in items:
+            for field_name in data:
+                if field_name in self.fields_info.linked or field_name in self.fields_info.custom:
+                    return False
+        return True
+
+    def _upsert_natively(self, graphql_paths, key_field_name, items):
+        """
+            Upsert `items` with `INSERT ... ON CONFLICT` statements, then read them back.
+        """
+        instances = [self.orm_model(**data) for data in items]
+        # validation (uniqueness is handled by the database)
+        self._validate_instances(
+            instances = instances,
+            graphql_paths = graphql_paths,
+            validate_unique = False)
+        # items providing the same fields are upserted together
+        groups = {}
+        for instance, data in zip(instances, items):
+            groups.setdefault(frozenset(data), []).append(instance)
+        for fields_names, group_instances in groups.items():
+            update_fields_names = fields_names - {key_field_name}
+            if update_fields_names:
+                update_fields_names |= self._get_auto_now_fields_names()
+            native_upsert(
+                orm_model = self.orm_model,
+                instances = group_instances,
+                key_field_name = key_field_name,
+                update_fields_names = update_fields_names,
+                batch_size = self.model_config.batch_size)
+        # read instances back, with their primary key
+        upserted_instances = self.orm_model.objects.in_bulk(
+            [data[key_field_name] for data in items],
+            field_name = key_field_name)
+        return [upserted_instances[data[key_field_name]] for data in items]
 
     # helpers for reading
 
-    def _read(self, graphql_selection, authenticated_user, **filters):
+    def _read(self, graphql_selection, authenticated_user, where=None, **filters):
         # build queryset as intended by easy_graphql_server
         queryset = self.build_queryset(
             graphql_selection = graphql_selection,
             authenticated_user = authenticated_user
         ).filter(**filters)
+        # structured filter
+        if where:
+            queryset = queryset.filter(where_to_q(*self.get_where_shape(where)))
         # filter queryset, depending on model config
         queryset = self.model_config.filter_for_user(
             queryset = queryset,
@@ -404,6 +1509,24 @@ class DjangoModelManager(ModelManager):
         except django.core.exceptions.ObjectDoesNotExist as error:
             raise exceptions.NotFoundError(filters) from error
 
+    def _prefetch_for_selection(self, instances, graphql_selection, authenticated_user):
+        """
+            Load the linked data required by `graphql_selection` for freshly written
+            instances, with the same lookups as `build_queryset()`, so that it is loaded
+            once per level instead of instance by instance.
+
+            Linked data is not filtered for the user, as it would not be when accessed
+            from the instances.
+        """
+        _, prefetch_related, select_related = self.build_queryset_parts(
+            graphql_selection = graphql_selection,
+            authenticated_user = authenticated_user,
+            filter_for_user = False,
+        )
+        if prefetch_related or select_related:
+            django.db.models.prefetch_related_objects(
+                instances, *select_related, *prefetch_related)
+
     def _instance_to_dict(self, instance, authenticated_user, graphql_selection, graphql_path,
             ensure_permission=True, depth=0):
         # pre-read trigger
@@ -435,8 +1558,7 @@ class DjangoModelManager(ModelManager):
                 if len(children_instances) == 0:
                     result[field_name] = []
                 else:
-                    model_manager = self.model_config.schema.get_model_config(
-                        orm_model=children_instances[0].__class__).orm_model_manager
+                    model_manager = self.get_linked_manager(field_name)
                     result[field_name] = [
                         model_manager._instance_to_dict(
                             authenticated_user = authenticated_user,
@@ -451,8 +1573,7 @@ class DjangoModelManager(ModelManager):
                     ]
             # foreign field
             elif field_value is not None:
-                model_manager = self.model_config.schema.get_model_config(
-                    orm_model=field_value.__class__).orm_model_manager
+                model_manager = self.get_linked_manager(field_name)
                 # pylint: disable=protected-access
                 result[field_name] = model_manager._instance_to_dict(
                     authenticated_user = authenticated_user,
@@ -466,17 +1587,24 @@ class DjangoModelManager(ModelManager):
         self.model_config.on_after_operation(instance, authenticated_user, Operation.READ, result, depth)
         return result
 
-    def build_queryset(self, graphql_selection, authenticated_user):
+    def build_queryset(self, graphql_selection, authenticated_user, filter_for_user=True):
         """
             Build queryset for given GraphQL selection
+
+            When `filter_for_user` is `False`, neither the queryset nor its prefetched
+            querysets are filtered for the user.
         """
         only, prefetch_related, select_related = (
             self.build_queryset_parts(
                 graphql_selection = graphql_selection,
                 authenticated_user = authenticated_user,
+                filter_for_user = filter_for_user,
             )
         )
-        base_queryset = self.model_config.filter_for_user(self.orm_model.objects, authenticated_user)
+        if filter_for_user:
+            base_queryset = self.model_config.filter_for_user(self.orm_model.objects, authenticated_user)
+        else:
+            base_queryset = self.orm_model.objects.all()
         if self.restrict_queried_fields:
             return (base_queryset
                 .only(*only)
@@ -489,7 +1617,7 @@ class DjangoModelManager(ModelManager):
         )
 
     def build_queryset_parts(self, graphql_selection, authenticated_user,
-            field_prefix=''):
+            field_prefix='', filter_for_user=True):
         """
             Build queryset parts for given GraphQL selection
 
@@ -499,7 +1627,6 @@ class DjangoModelManager(ModelManager):
              - a list of what should be passed to `QuerySet.prefetch_related()`
              - a list of what should be passed to `QuerySet.select_related()`
         """
-        schema = self.model_config.schema
         # initialize result
         only = []
         prefetch_related = []
@@ -514,13 +1641,13 @@ class DjangoModelManager(ModelManager):
                 foreign_field = self.fields_info.foreign[field_name]
                 only.append(field_prefix + foreign_field.value_field_name)
                 select_related.append(field_prefix + field_name)
-                foreign_orm_model_manager = schema.get_model_config(
-                    orm_model = foreign_field.orm_model).orm_model_manager
+                foreign_orm_model_manager = self.get_linked_manager(field_name)
                 foreign_only, foreign_prefetch_related, foreign_select_related = (
                     foreign_orm_model_manager.build_queryset_parts(
                         graphql_selection = graphql_subselection,
                         authenticated_user = authenticated_user,
-                        field_prefix = f'{field_prefix}{field_name}__'
+                        field_prefix = f'{field_prefix}{field_name}__',
+                        filter_for_user = filter_for_user,
                     )
                 )
                 only += foreign_only
@@ -529,16 +1656,15 @@ class DjangoModelManager(ModelManager):
             # there is a subselection, and it is a related field
             elif field_name in self.fields_info.related:
                 related_field = self.fields_info.related[field_name]
-                related_model_config = schema.get_model_config(
-                    orm_model = related_field.orm_model)
                 prefetch_related.append(
                     django.db.models.Prefetch(
                         f'{field_prefix}{field_name}',
-                        queryset = related_model_config.orm_model_manager.build_queryset(
+                        queryset = self.get_linked_manager(field_name).build_queryset(
                             authenticated_user = authenticated_user,
                             graphql_selection = dict(
                                 {related_field.value_field_name: None},
                                 **graphql_subselection),
+                            filter_for_user = filter_for_user,
                         )
                     )
                 )
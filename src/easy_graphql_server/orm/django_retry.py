@@ -0,0 +1,40 @@
+"""
+    Classification of transient Django database errors, which can be fixed by
+    running the failed transaction again.
+"""
+
+import random
+
+import django.db
+
+
+# SQLSTATE codes for `serialization_failure` & `deadlock_detected` (PostgreSQL)
+RETRYABLE_SQLSTATES = {'40001', '40P01'}
+# error codes for "lock wait timeout exceeded" & "deadlock found" (MySQL/MariaDB)
+RETRYABLE_MYSQL_CODES = {1205, 1213}
+# messages for locked database or table (SQLite)
+RETRYABLE_MESSAGES = ('database is locked', 'database table is locked')
+
+
+def is_retryable_error(exception):
+    """
+        Tell whether `exception` was caused by a lock or a serialization conflict
+        with a concurrent transaction.
+    """
+    if not isinstance(exception, django.db.OperationalError):
+        return False
+    cause = exception.__cause__
+    # psycopg2 exposes `pgcode`, psycopg 3 exposes `sqlstate`
+    sqlstate = getattr(cause, 'pgcode', None) or getattr(cause, 'sqlstate', None)
+    if sqlstate in RETRYABLE_SQLSTATES:
+        return True
+    if cause is not None and cause.args and cause.args[0] in RETRYABLE_MYSQL_CODES:
+        return True
+    return any(message in str(exception) for message in RETRYABLE_MESSAGES)
+
+def get_retry_delay(attempt, base_delay, max_delay):
+    """
+        Delay in seconds before retrying after `attempt` failed attempts: exponential
+        backoff, with full jitter so that conflicting transactions do not collide again.
+    """
+    return random.uniform(0, min(max_delay, base_delay * 2 ** (attempt - 1)))
@@ -0,0 +1,173 @@
+"""
+    Full-text search on Django querysets.
+
+    On SQLite, an FTS5 virtual table is kept in sync with the model's table through
+    triggers; they should be created with `ensure_search_index()` (e.g. from a migration),
+    otherwise this is done on first search. On PostgreSQL, `SearchVector` and
+    `SearchRank` are used (a GIN index on the same vector should be declared on the model
+    for the search to be efficient). Other databases fall back to `icontains` lookups.
+
+    Results are ordered by relevance whenever a full-text index is used.
+"""
+
+import re
+import threading
+
+import django.db
+import django.db.models
+from django.db.models.expressions import RawSQL
+
+
+SEARCH_RANK_ANNOTATION = '_egs_search_rank'
+SEARCH_VECTOR_ANNOTATION = '_egs_search_vector'
+
+# whether the FTS5 index can be used, as `dict[tuple[str,type],bool]` (per database & model)
+_sqlite_indexes = {}
+_sqlite_indexes_lock = threading.Lock()
+
+
+def apply_search(queryset, fields, text):
+    """
+        Filter a Django `queryset` on the given text `fields`, and order it by relevance.
+    """
+    connection = django.db.connections[queryset.db]
+    if connection.vendor == 'postgresql':
+        return _apply_postgres_search(queryset, fields, text)
+    if connection.vendor == 'sqlite' and ensure_search_index(queryset.model, fields, queryset.db):
+        return _apply_sqlite_search(queryset, text)
+    return _apply_fallback_search(queryset, fields, text)
+
+def ensure_search_index(orm_model, fields, using=django.db.DEFAULT_DB_ALIAS):
+    """
+        Create the full-text index used to search the given text `fields` of `orm_model`,
+        if needed (only SQLite requires it); can be called from a migration, with
+        `migrations.RunPython`.
+
+        Returns `False` when no full-text index can be used for this model.
+    """
+    connection = django.db.connections[using]
+    if connection.vendor != 'sqlite':
+        return connection.vendor == 'postgresql'
+    key = (using, orm_model)
+    result = _sqlite_indexes.get(key)
+    if result is None:
+        with _sqlite_indexes_lock:
+            result = _sqlite_indexes.get(key)
+            if result is None:
+                result = _create_sqlite_index(connection, orm_model, fields)
+                if result:
+                    # the index would vanish if the enclosing transaction is rolled back
+                    django.db.transaction.on_commit(
+                        lambda: _sqlite_indexes.setdefault(key, True), using=using)
+                else:
+                    _sqlite_indexes[key] = False
+    return result
+
+# PostgreSQL
+
+def _apply_postgres_search(queryset, fields, text):
+    # pylint: disable=import-outside-toplevel
+    from django.contrib.postgres.search import SearchVector, SearchQuery, SearchRank
+    vector = SearchVector(*fields)
+    query = SearchQuery(text)
+    # filtering with the `@@` operator allows the use of a GIN index on the vector
+    return (queryset
+        .annotate(**{SEARCH_VECTOR_ANNOTATION: vector})
+        .filter(**{SEARCH_VECTOR_ANNOTATION: query})
+        .annotate(**{SEARCH_RANK_ANNOTATION: SearchRank(vector, query)})
+        .order_by(f'-{SEARCH_RANK_ANNOTATION}')
+    )
+
+# SQLite
+
+def _get_sqlite_index_name(orm_model):
+    return f'{orm_model._meta.db_table}__fts' # pylint: disable=protected-access
+
+def _create_sqlite_index(connection, orm_model, fields):
+    """
+        Create the FTS5 virtual table and its triggers when they do not exist yet, all
+        at once within a transaction.
+
+        Returns `False` when the index cannot be used for this model.
+    """
+    # pylint: disable=protected-access
+    primary_key = orm_model._meta.pk
+    if not isinstance(primary_key, (django.db.models.AutoField, django.db.models.IntegerField)):
+        return False
+    index_name = _get_sqlite_index_name(orm_model)
+    with django.db.transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [index_name])
+        exists = cursor.fetchone() is not None
+        table = connection.ops.quote_name(orm_model._meta.db_table)
+        index = connection.ops.quote_name(index_name)
+        rowid = connection.ops.quote_name(primary_key.column)
+        columns = [
+            connection.ops.quote_name(orm_model._meta.get_field(field_name).column)
+            for field_name in fields
+        ]
+        columns_list = ', '.join(columns)
+        new_values = ', '.join(f'new.{column}' for column in columns)
+        old_values = ', '.join(f'old.{column}' for column in columns)
+        statements = (
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS {index} USING fts5('
+                f"{columns_list}, content='{orm_model._meta.db_table}', "
+                f"content_rowid='{primary_key.column}')",
+            f'CREATE TRIGGER IF NOT EXISTS {connection.ops.quote_name(index_name + "__insert")} '
+                f'AFTER INSERT ON {table} BEGIN '
+                f'INSERT INTO {index}(rowid, {columns_list}) VALUES (new.{rowid}, {new_values}); '
+                'END',
+            f'CREATE TRIGGER IF NOT EXISTS {connection.ops.quote_name(index_name + "__delete")} '
+                f'AFTER DELETE ON {table} BEGIN '
+                f"INSERT INTO {index}({index}, rowid, {columns_list}) VALUES ('delete', old.{rowid}, {old_values}); "
+                'END',
+            f'CREATE TRIGGER IF NOT EXISTS {connection.ops.quote_name(index_name + "__update")} '
+                f'AFTER UPDATE ON {table} BEGIN '
+                f"INSERT INTO {index}({index}, rowid, {columns_list}) VALUES ('delete', old.{rowid}, {old_values}); "
+                f'INSERT INTO {index}(rowid, {columns_list}) VALUES (new.{rowid}, {new_values}); '
+                'END',
+        )
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        except django.db.OperationalError as error:
+            # FTS5 extension is not available
+            if 'no such module' in str(error):
+                return False
+            raise
+        # index existing rows
+        if not exists:
+            cursor.execute(f"INSERT INTO {index}({index}) VALUES ('rebuild')")
+    return True
+
+def _to_sqlite_match_expression(text):
+    # every word is quoted, so FTS5 operators cannot be injected in the query
+    words = re.findall(r'\w+', text)
+    return ' '.join(f'"{word}"' for word in words)
+
+def _apply_sqlite_search(queryset, text):
+    orm_model = queryset.model
+    match_expression = _to_sqlite_match_expression(text)
+    if not match_expression:
+        return queryset
+    connection = django.db.connections[queryset.db]
+    table = connection.ops.quote_name(orm_model._meta.db_table) # pylint: disable=protected-access
+    index = connection.ops.quote_name(_get_sqlite_index_name(orm_model))
+    rowid = connection.ops.quote_name(orm_model._meta.pk.column) # pylint: disable=protected-access
+    return (queryset
+        .annotate(**{SEARCH_RANK_ANNOTATION: RawSQL(
+            f'SELECT rank FROM {index} WHERE {index} MATCH %s AND rowid = {table}.{rowid}',
+            [match_expression])})
+        .filter(pk__in=RawSQL(
+            f'SELECT rowid FROM {index} WHERE {index} MATCH %s',
+            [match_expression]))
+        .order_by(SEARCH_RANK_ANNOTATION)
+    )
+
+# other databases
+
+def _apply_fallback_search(queryset, fields, text):
+    condition = django.db.models.Q()
+    for field_name in fields:
+        condition |= django.db.models.Q(**{f'{field_name}__icontains': text})
+    return queryset.filter(condition)
@@ -0,0 +1,44 @@
+"""
+    Native upserts with Django, i.e. `INSERT ... ON CONFLICT DO UPDATE` statements.
+
+    They rely on `QuerySet.bulk_create(update_conflicts=True)`, which is available since
+    Django 4.1 for PostgreSQL, SQLite and MariaDB/MySQL.
+"""
+
+import inspect
+
+import django.db
+import django.db.models
+
+
+def supports_native_upsert(orm_model):
+    """
+        Tell whether both the installed Django version and the database used to write
+        instances of `orm_model` support native upserts.
+    """
+    if 'update_conflicts' not in inspect.signature(django.db.models.QuerySet.bulk_create).parameters:
+        return False
+    connection = django.db.connections[django.db.router.db_for_write(orm_model)]
+    return connection.features.supports_update_conflicts_with_target
+
+def native_upsert(orm_model, instances, key_field_name, update_fields_names, batch_size=None):
+    """
+        Insert `instances`, or update the columns in `update_fields_names` for rows that
+        already exist with the same value for `key_field_name`.
+
+        Instances should provide values for the same fields; primary keys of instances
+        are not set.
+    """
+    if update_fields_names:
+        orm_model.objects.bulk_create(
+            instances,
+            batch_size = batch_size,
+            update_conflicts = True,
+            unique_fields = [key_field_name],
+            update_fields = sorted(update_fields_names))
+    # nothing to update, existing rows are left untouched
+    else:
+        orm_model.objects.bulk_create(
+            instances,
+            batch_size = batch_size,
+            ignore_conflicts = True)
@@ -0,0 +1,60 @@
+"""
+    Compilation of structured `where` filters into Django `Q` objects.
+
+    Filters are first split into a shape and values by `ModelManager.get_where_shape()`;
+    shapes are compiled once into a plan, which is then cached and reused for every
+    filter with the same structure.
+"""
+
+import functools
+
+from django.db.models import Q
+
+
+def where_to_q(shape, values):
+    """
+        Build a Django `Q` object from a `where` filter shape and its values.
+    """
+    plan = _compile(shape)
+    return plan(iter(values))
+
+@functools.lru_cache(maxsize=1024)
+def _compile(shape, prefix=''):
+    plans = []
+    for kind, key, subshape in shape:
+        if kind in ('and', 'or'):
+            plans.append(_compile_operator(kind, [_compile(item, prefix) for item in subshape]))
+        elif kind == 'not':
+            plans.append(_compile_not(_compile(subshape, prefix)))
+        elif kind == 'linked':
+            plans.append(_compile(subshape, f'{prefix}{key}__'))
+        else:
+            plans.append(_compile_lookups([
+                f'{prefix}{key}' if lookup_name == 'exact' else f'{prefix}{key}__{lookup_name}'
+                for lookup_name in subshape
+            ]))
+    return _compile_operator('and', plans)
+
+def _compile_operator(kind, plans):
+    if kind == 'or' and not plans:
+        # an empty disjunction matches nothing
+        return lambda values: Q(pk__in=[])
+    def plan(values):
+        result = Q()
+        for subplan in plans:
+            if kind == 'and':
+                result &= subplan(values)
+            else:
+                result |= subplan(values)
+        return result
+    return plan
+
+def _compile_not(subplan):
+    def plan(values):
+        return ~subplan(values)
+    return plan
+
+def _compile_lookups(paths):
+    def plan(values):
+        return Q(**{path: next(values) for path in paths})
+    return plan
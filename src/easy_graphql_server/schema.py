@@ -6,21 +6,34 @@
 import re
 import json
 import inspect
-from collections import defaultdict
+import contextlib
+import functools
+from collections import defaultdict, namedtuple, Counter
 import logging
 import threading
+import time
+import gc
+import tracemalloc
 
-from graphql import GraphQLSchema, GraphQLField, GraphQLObjectType
+from graphql import (GraphQLSchema, GraphQLField, GraphQLObjectType, GraphQLString,
+    GraphQLError, ExecutionResult, parse, validate)
 from graphql.type.validate import validate_schema # pylint: disable=no-name-in-module,import-error
-from graphql.utilities import get_introspection_query # pylint: disable=no-name-in-module,import-error
+from graphql.utilities import get_introspection_query, get_operation_ast, print_schema # pylint: disable=no-name-in-module,import-error
 from graphql.graphql import graphql_sync
-from graphql.language.ast import FieldNode, InlineFragmentNode, FragmentSpreadNode
+from graphql.language.ast import FieldNode, InlineFragmentNode, FragmentSpreadNode, OperationType, \
+    FragmentDefinitionNode, OperationDefinitionNode
 
 from . import exceptions, exposition, introspection
 from .conversion import to_graphql_type, to_graphql_argument
 from .model_config import ModelConfig
 from .casing import Casing
+from .background import BackgroundExecutor
+from .type_registry import TypeRegistry
 from .context import ContextValue
+from .fingerprint import get_schema_fingerprint
+
+
+SchemaSnapshot = namedtuple('SchemaSnapshot', ('version', 'graphql_schema'))
 
 
 class Schema:
@@ -42,17 +55,30 @@ class Schema:
 
     _requests_logger = logging.getLogger('easy_graphql_server.requests')
     _processing_logger = logging.getLogger('easy_graphql_server.processing')
-    _lock = threading.Lock()
+    _snapshot_header = '# easy_graphql_server schema fingerprint: '
 
     # public methods
 
     def __init__(self, debug=False, casing=Casing.SNAKE, restrict_models_queried_fields=False,
-        models_max_depth=None, models_limit=-1, models_allowed_lookups=None, models_disallowed_lookups=None):
+        models_max_depth=None, models_limit=-1, models_allowed_lookups=None, models_disallowed_lookups=None,
+        models_flat_filters=True, models_batch_size=None,
+        after_commit_max_workers=4, after_commit_max_pending=1000, after_commit_synchronous=False,
+        transactions_max_retries=3, transactions_retry_base_delay=0.01, transactions_retry_max_delay=1.0,
+        atomic_mutations=False, type_registry=None, lazy_models=False):
         self.methods = defaultdict(dict)
         self.subclasses = []
-        self.dirty = True
-        self.graphql_schema = None
         self.models_configs = []
+        # indexes of `self.models_configs`
+        self._models_configs_by_orm_model = {}
+        self._models_configs_by_name = {}
+        # writers (exposition & build) are serialized, readers use the latest snapshot
+        self._lock = threading.RLock()
+        self._version = 0
+        self._snapshot = None
+        # what changed since the last build
+        self._collected_subclasses = set()
+        self._exposed_models_configs = set()
+        self._changed_methods = defaultdict(set)
         # options
         self.case_manager = casing.value
         self.debug = debug
@@ -61,6 +87,22 @@ class Schema:
         self.models_limit = models_limit
         self.models_allowed_lookups = models_allowed_lookups
         self.models_disallowed_lookups = models_disallowed_lookups
+        self.models_flat_filters = models_flat_filters
+        self.models_batch_size = models_batch_size
+        self.transactions_max_retries = transactions_max_retries
+        self.transactions_retry_base_delay = transactions_retry_base_delay
+        self.transactions_retry_max_delay = transactions_retry_max_delay
+        self.atomic_mutations = atomic_mutations
+        self.lazy_models = lazy_models
+        # instrumentation counters
+        self.stats = Counter()
+        # GraphQL types built for this schema
+        self.type_registry = TypeRegistry() if type_registry is None else type_registry
+        # executor for post-commit triggers
+        self.after_commit_executor = BackgroundExecutor(
+            max_workers = after_commit_max_workers,
+            max_pending = after_commit_max_pending,
+            synchronous = after_commit_synchronous)
         # abstract parent classes
         class Exposed(exposition.Exposed):
             # pylint: disable=too-few-public-methods,missing-class-docstring
@@ -80,6 +122,29 @@ class Schema:
         self.ExposedMutation = ExposedMutation # pylint: disable=invalid-name
         self.orm_model_manager_classes = []
 
+    @property
+    def dirty(self):
+        """
+            Tell whether something was exposed since the GraphQL schema was last built.
+        """
+        snapshot = self._snapshot
+        return snapshot is None or snapshot.version != self._version
+
+    @dirty.setter
+    def dirty(self, value):
+        # the schema can only be marked as outdated
+        if value:
+            with self._lock:
+                self._version += 1
+
+    @property
+    def graphql_schema(self):
+        """
+            Latest built GraphQL schema, if any.
+        """
+        snapshot = self._snapshot
+        return snapshot.graphql_schema if snapshot is not None else None
+
     def get_documentation(self, with_descriptions=False):
         """
             Return GraphQL schema description in JSON format.
@@ -120,17 +185,31 @@ class Schema:
 
             See `ModelConfig` class constructor for more info about options.
         """
-        self.dirty = True
         if 'restrict_queried_fields' not in options:
             options['restrict_queried_fields'] = self.restrict_models_queried_fields
-        for option_name in ('max_depth', 'limit', 'allowed_lookups', 'disallowed_lookups'):
+        for option_name in ('max_depth', 'limit', 'allowed_lookups', 'disallowed_lookups', 'flat_filters',
+                'batch_size'):
             if option_name not in options:
                 options[option_name] = getattr(self, f'models_{option_name}')
-        model_config = ModelConfig(orm_model=orm_model, schema=self, **options)
-        self.models_configs.append(model_config)
-        orm_model_manager_class = model_config.orm_model_manager.__class__
-        if orm_model_manager_class not in self.orm_model_manager_classes:
-            self.orm_model_manager_classes.append(orm_model_manager_class)
+        with self._lock:
+            model_config = ModelConfig(orm_model=orm_model, schema=self, **options)
+            self.models_configs.append(model_config)
+            self._models_configs_by_orm_model.setdefault(orm_model, model_config)
+            self._models_configs_by_name.setdefault(model_config.name, model_config)
+            # links between exposed models may have changed
+            for other_model_config in self.models_configs:
+                other_model_config.orm_model_manager.unlink_managers()
+                other_model_config.clear_type_mappings()
+            # methods & types of the models already exposed are built again when linked
+            if any(model_config.is_linked_to(exposed_model_config)
+                    for exposed_model_config in self._exposed_models_configs):
+                with self.type_registry.refreshing(self):
+                    for exposed_model_config in self._exposed_models_configs:
+                        exposed_model_config.expose_methods()
+            orm_model_manager_class = model_config.orm_model_manager.__class__
+            if orm_model_manager_class not in self.orm_model_manager_classes:
+                self.orm_model_manager_classes.append(orm_model_manager_class)
+            self._version += 1
 
     def execute(self, query, variables=None, operation_name=None,
             authenticated_user=None,
@@ -152,9 +231,11 @@ class Schema:
             'authenticated_user': authenticated_user.username if authenticated_user is not None else None,
             'query': simpler_query[:64] + '...' if len(simpler_query) > 64 else simpler_query,
         }))
+        # root fields of the query; in lazy mode, the models providing them are exposed
+        root_fields_names = self._expose_queried_models(query)
         # actual query execution
-        result = graphql_sync(
-            schema = self._get_graphql_schema(),
+        execute = functools.partial(graphql_sync,
+            schema = self._get_graphql_schema(root_fields_names),
             source = query,
             variable_values = variables or {},
             operation_name = operation_name,
@@ -162,6 +243,10 @@ class Schema:
                 authenticated_user = authenticated_user,
             ),
         )
+        if self.atomic_mutations and self._is_mutation(query, operation_name):
+            result = self._execute_atomically(execute)
+        else:
+            result = execute()
         # must the output be serializable?
         if serializable_output:
             formatted_result = result.formatted
@@ -175,10 +260,103 @@ class Schema:
             Check the schema's validity; an exception is raised if something is wrong.
         """
         if graphql_schema is None:
+            self._expose_models()
             graphql_schema = self._get_graphql_schema()
+            # the whole schema is validated again, not only the latest changes
+            graphql_schema._validation_errors = None # pylint: disable=protected-access
         for error in validate_schema(graphql_schema):
             raise error
 
+    def warm_up(self, queries=(), freeze=True):
+        """
+            Build everything that would otherwise be built upon the first requests: the
+            GraphQL schema, and the info about the fields of every model; given queries
+            are validated against the schema (in lazy mode, their models are exposed).
+
+            Intended to be called in the master process of a preforking server (e.g.
+            gunicorn with `preload_app`): when `freeze` is `True`, objects allocated so
+            far are moved to a permanent generation of the garbage collector with
+            `gc.freeze()`, so that they remain shared with workers instead of being
+            copied upon collections.
+
+            No database query is performed. Returns a `dict` with the `duration` (in
+            seconds) and the `memory` (in bytes) spent, and the number of `frozen`
+            objects.
+        """
+        was_tracing = tracemalloc.is_tracing()
+        if not was_tracing:
+            tracemalloc.start()
+        memory_before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            # schema & models
+            for query in queries:
+                self._expose_queried_models(query)
+            graphql_schema = self._get_graphql_schema()
+            for model_config in self.models_configs:
+                model_config.orm_model_manager.link_managers()
+            # queries
+            for query in queries:
+                for error in validate(graphql_schema, parse(query)):
+                    raise error
+            report = {
+                'duration': time.perf_counter() - start,
+                'memory': tracemalloc.get_traced_memory()[0] - memory_before,
+            }
+        finally:
+            if not was_tracing:
+                tracemalloc.stop()
+        # keep objects shared between forked processes (`gc.freeze()` requires Python 3.7)
+        if freeze and hasattr(gc, 'freeze'):
+            gc.collect()
+            gc.freeze()
+        report['frozen'] = gc.get_freeze_count() if hasattr(gc, 'get_freeze_count') else 0
+        self._processing_logger.info(json.dumps({'warm_up': report}))
+        return report
+
+    def save_snapshot(self, path):
+        """
+            Validate the whole GraphQL schema, then save it to a file in SDL format, along
+            with its fingerprint (e.g. at deploy time); see `load_snapshot()`.
+        """
+        self.check()
+        graphql_schema = self._get_graphql_schema()
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(f'{self._snapshot_header}{get_schema_fingerprint(graphql_schema)}\n\n')
+            file.write(print_schema(graphql_schema))
+
+    def load_snapshot(self, path):
+        """
+            Build the GraphQL schema right away (e.g. when a worker starts), instead of
+            upon the first request.
+
+            If the built schema has the same fingerprint as the one saved with
+            `save_snapshot()`, it is not validated again; otherwise (e.g. models changed
+            since the snapshot was saved, or there is no such file), it is fully validated.
+            Returns `True` if the snapshot could be used.
+        """
+        fingerprint = None
+        try:
+            with open(path, encoding='utf-8') as file:
+                header = file.readline().rstrip('\n')
+            if header.startswith(self._snapshot_header):
+                fingerprint = header[len(self._snapshot_header):]
+        except FileNotFoundError:
+            pass
+        self._expose_models()
+        with self._lock:
+            graphql_schema = self._make_graphql_schema()
+            is_valid = fingerprint is not None and get_schema_fingerprint(graphql_schema) == fingerprint
+            if is_valid:
+                # already validated when the snapshot was saved
+                graphql_schema._validation_errors = [] # pylint: disable=protected-access
+                self._changed_methods.clear()
+            else:
+                self._processing_logger.warning('Schema snapshot `%s` is missing or outdated', path)
+                self._check_changes(graphql_schema)
+            self._snapshot = SchemaSnapshot(self._version, graphql_schema)
+        return is_valid
+
     def get_model_config(self, orm_model=None, name=None):
         """
             Retrieve an instance of `ModelConfig` if the passed `orm_model` has been
@@ -187,10 +365,9 @@ class Schema:
         if not bool(orm_model) ^ bool(name):
             raise ValueError('You have to specify exactly one of the following parameters: '
                 '`orm_model`, `name`')
-        for model_config in self.models_configs:
-            if model_config.orm_model_manager.orm_model == orm_model or model_config.name == name:
-                return model_config
-        return None
+        if orm_model:
+            return self._models_configs_by_orm_model.get(orm_model)
+        return self._models_configs_by_name.get(name)
 
     def as_django_view(self, with_graphiql=True, compute_user=True):
         """
@@ -246,46 +423,48 @@ class Schema:
     def _expose_method(self, type_, name, method, input_format=None, output_format=None,
             pass_graphql_selection=False, pass_graphql_path=False,
             pass_authenticated_user=False, require_authenticated_user=False, deprecation_message=None):
-        self.methods[type_][name] = GraphQLField(
-            # output format
-            type_ = to_graphql_type(
-                type_ = output_format,
-                prefix = name,
-                for_input = False,
-                schema = self,
-            ) if output_format else None,
-            # input format
-            args = to_graphql_argument(
-                type_ = input_format,
-                prefix = name,
-                schema = self,
-            ) if input_format else None,
-            # resolve method
-            resolve = self._make_callback(
-                type_ = type_,
-                method = method,
-                pass_graphql_selection = (
-                    'graphql_selection'
-                    if pass_graphql_selection is True else
-                    pass_graphql_selection
-                ),
-                pass_graphql_path = (
-                    'graphql_path'
-                    if pass_graphql_path is True else
-                    pass_graphql_path
-                ),
-                pass_authenticated_user = (
-                    'authenticated_user'
-                    if pass_authenticated_user is True else
-                    pass_authenticated_user
+        with self._lock:
+            self.methods[type_][name] = GraphQLField(
+                # output format
+                type_ = to_graphql_type(
+                    type_ = output_format,
+                    prefix = name,
+                    for_input = False,
+                    schema = self,
+                ) if output_format else None,
+                # input format
+                args = to_graphql_argument(
+                    type_ = input_format,
+                    prefix = name,
+                    schema = self,
+                ) if input_format else None,
+                # resolve method
+                resolve = self._make_callback(
+                    type_ = type_,
+                    method = method,
+                    pass_graphql_selection = (
+                        'graphql_selection'
+                        if pass_graphql_selection is True else
+                        pass_graphql_selection
+                    ),
+                    pass_graphql_path = (
+                        'graphql_path'
+                        if pass_graphql_path is True else
+                        pass_graphql_path
+                    ),
+                    pass_authenticated_user = (
+                        'authenticated_user'
+                        if pass_authenticated_user is True else
+                        pass_authenticated_user
+                    ),
+                    require_authenticated_user = require_authenticated_user,
                 ),
-                require_authenticated_user = require_authenticated_user,
-            ),
-            # deprecation
-            deprecation_reason = deprecation_message,
-        )
-        # schema is not up to date anymore
-        self.dirty = True
+                # deprecation
+                deprecation_reason = deprecation_message,
+            )
+            # schema is not up to date anymore
+            self._changed_methods[type_].add(name)
+            self._version += 1
 
     def _expose_from_subclass(self, subclass):
         subclass_attributes = introspection.get_public_class_attributes(subclass)
@@ -319,36 +498,202 @@ class Schema:
         exposition_method(**subclass_attributes)
 
     def _collect_from_classes(self):
+        # subclasses are only exposed once
         for subclass in introspection.get_subclasses(self.Exposed):
             if subclass not in (self.ExposedModel, self.ExposedQuery, self.ExposedMutation):
-                self.expose(subclass)
+                if subclass not in self._collected_subclasses:
+                    self._collected_subclasses.add(subclass)
+                    self.expose(subclass)
         for subclass in self.subclasses:
-            self._expose_from_subclass(subclass)
+            if subclass not in self._collected_subclasses:
+                self._collected_subclasses.add(subclass)
+                self._expose_from_subclass(subclass)
 
 
     # build schema when modified, returned cached version otherwise
 
     def _make_graphql_schema(self):
         self._collect_from_classes()
-        # collect methods from exposed models
-        for model_config in self.models_configs:
-            model_config.expose_methods()
-        # build and return schema
+        # collect methods from models exposed since the last build (when needed in lazy mode)
+        if not self.lazy_models:
+            self._expose_models()
+        # resolve managers of linked models once, instead of on each operation
+        for model_config in self._exposed_models_configs:
+            model_config.orm_model_manager.link_managers()
+        # build and return schema, reusing the fields & types built so far
         return GraphQLSchema(
             query = GraphQLObjectType('Query',
-                lambda: self.methods['query']) if self.methods['query'] else None,
+                dict(self.methods['query'])) if self.methods['query'] else None,
             mutation = GraphQLObjectType('Mutation',
-                lambda: self.methods['mutation']) if self.methods['query'] else None,
+                dict(self.methods['mutation'])) if self.methods['mutation'] else None,
         )
 
-    def _get_graphql_schema(self):
+    def _expose_models(self, methods_names=None):
+        """
+            Expose the methods of the models that were not exposed yet; when
+            `methods_names` is given, only the models providing one of these methods are.
+        """
         with self._lock:
-            if self.dirty:
+            self._collect_from_classes()
+            for model_config in self.models_configs:
+                if model_config in self._exposed_models_configs:
+                    continue
+                model_methods_names = model_config.get_methods_names()
+                if methods_names is not None and model_methods_names and \
+                        model_methods_names.isdisjoint(methods_names):
+                    continue
+                model_config.expose_methods()
+                self._exposed_models_configs.add(model_config)
+
+    def _expose_queried_models(self, query):
+        """
+            In lazy mode, expose the models providing the root fields of `query`; every
+            model is exposed for introspection queries.
+
+            Returns the names of the root fields the GraphQL schema must provide to
+            execute the query.
+        """
+        methods_names = self._get_query_root_fields_names(query)
+        if not self.lazy_models:
+            return methods_names
+        if not self.dirty and len(self._exposed_models_configs) == len(self.models_configs):
+            return methods_names
+        if any(name.startswith('__') for name in methods_names):
+            self._expose_models()
+        elif any(name not in self.methods['query'] and name not in self.methods['mutation']
+                for name in methods_names):
+            self._expose_models(methods_names)
+        return methods_names
+
+    @classmethod
+    @functools.lru_cache(maxsize=1024)
+    def _get_query_root_fields_names(cls, query):
+        # memoized, so that queries sent again are only parsed upon execution
+        try:
+            document = parse(query)
+        except GraphQLError:
+            # the error is reported upon execution
+            return frozenset()
+        fragments = {
+            definition.name.value: definition
+            for definition in document.definitions
+            if isinstance(definition, FragmentDefinitionNode)
+        }
+        methods_names = set()
+        for definition in document.definitions:
+            if isinstance(definition, OperationDefinitionNode):
+                methods_names |= cls._get_root_fields_names(definition.selection_set, fragments)
+        return frozenset(methods_names)
+
+    @classmethod
+    def _get_root_fields_names(cls, selection_set, fragments, visited_fragments=frozenset()):
+        names = set()
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                names.add(selection.name.value)
+            elif isinstance(selection, InlineFragmentNode):
+                names |= cls._get_root_fields_names(selection.selection_set, fragments, visited_fragments)
+            elif isinstance(selection, FragmentSpreadNode):
+                fragment_name = selection.name.value
+                if fragment_name in fragments and fragment_name not in visited_fragments:
+                    names |= cls._get_root_fields_names(fragments[fragment_name].selection_set,
+                        fragments, visited_fragments | {fragment_name})
+        return names
+
+    def _check_changes(self, graphql_schema):
+        """
+            Validate only the methods exposed since the last build (and the types they
+            depend on), then mark the whole schema as valid.
+        """
+        placeholder = {'_': GraphQLField(GraphQLString)}
+        changed_schema = GraphQLSchema(
+            query = GraphQLObjectType('Query', {
+                name: self.methods['query'][name]
+                for name in self._changed_methods['query']
+            } or placeholder),
+            mutation = GraphQLObjectType('Mutation', {
+                name: self.methods['mutation'][name]
+                for name in self._changed_methods['mutation']
+            }) if self._changed_methods['mutation'] else None,
+        )
+        self.check(changed_schema)
+        # unchanged types were already validated
+        graphql_schema._validation_errors = [] # pylint: disable=protected-access
+        self._changed_methods.clear()
+
+    def _get_graphql_schema(self, root_fields_names=None):
+        """
+            Return the latest GraphQL schema; while another thread builds a new one,
+            the previous one is returned if it provides every root field in
+            `root_fields_names` (when `None`, the new one is always waited for).
+        """
+        # up to date snapshot, without locking
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == self._version:
+            return snapshot.graphql_schema
+        # while another thread builds a new snapshot, the previous one is used if it can
+        blocking = not self._provides_root_fields(snapshot, root_fields_names)
+        if not self._lock.acquire(blocking=blocking): # pylint: disable=consider-using-with
+            return snapshot.graphql_schema
+        try:
+            snapshot = self._snapshot
+            if snapshot is None or snapshot.version != self._version:
                 graphql_schema = self._make_graphql_schema()
-                self.check(graphql_schema)
-                self.graphql_schema = graphql_schema
-                self.dirty = False
-        return self.graphql_schema
+                self._check_changes(graphql_schema)
+                # atomically publish the new snapshot
+                self._snapshot = SchemaSnapshot(self._version, graphql_schema)
+            return self._snapshot.graphql_schema
+        finally:
+            self._lock.release()
+
+    @staticmethod
+    def _provides_root_fields(snapshot, root_fields_names):
+        if snapshot is None or root_fields_names is None:
+            return False
+        graphql_schema = snapshot.graphql_schema
+        fields = {}
+        for root_type in (graphql_schema.query_type, graphql_schema.mutation_type):
+            if root_type is not None:
+                fields.update(root_type.fields)
+        # introspection fields are not listed, so introspection queries always wait
+        return all(name in fields for name in root_fields_names)
+
+    # document-level transactions
+
+    @staticmethod
+    def _is_mutation(query, operation_name):
+        try:
+            operation = get_operation_ast(parse(query), operation_name)
+        except GraphQLError:
+            return False
+        return operation is not None and operation.operation == OperationType.MUTATION
+
+    def _execute_atomically(self, execute):
+        """
+            Perform all the mutations of a document within a single transaction per
+            ORM: either every mutation succeeds, or none does.
+        """
+        managers_classes = dict.fromkeys(
+            type(model_config.orm_model_manager)
+            for model_config in self.models_configs)
+        try:
+            with contextlib.ExitStack() as stack:
+                documents = [
+                    stack.enter_context(manager_class.atomic_document())
+                    for manager_class in managers_classes
+                ]
+                result = execute()
+                if result.errors:
+                    for document in documents:
+                        document.rollback()
+        # deferred validation failed
+        except exceptions.BaseError as error:
+            self._processing_logger.warning(error.format_for_logs())
+            return ExecutionResult(data=None, errors=[GraphQLError(str(error), original_error=error)])
+        # nothing was performed
+        if result.errors:
+            return ExecutionResult(data=None, errors=result.errors)
+        return result
 
     # build wrapper around passed methods to build a callback
 
@@ -0,0 +1,150 @@
+"""
+    This module defines the `TypeRegistry` class, which holds the GraphQL types
+    built for a `Schema`.
+"""
+
+import contextlib
+import inspect
+import threading
+import weakref
+from collections import Counter
+
+from graphql.type.definition import GraphQLType
+
+from . import types
+
+
+class TypeRegistry:
+
+    """
+        GraphQL object, input & enum types built for a schema, indexed by name.
+
+        Each `Schema` owns a registry, which is released with it; types with the
+        same name are built only once within a schema, and never leak into another
+        one. A registry can be explicitly shared between schemas through the
+        `type_registry` option of `Schema`, when they define identical types under
+        the same names (e.g. one schema per tenant, built from the same models);
+        a `ValueError` is raised when a schema defines a type differently from the
+        one another schema registered under the same name.
+    """
+
+    def __init__(self):
+        self._types = {}
+        self._definitions = {}
+        self._fingerprints = {}
+        self._owners = {}
+        # names of the types refreshed so far, indexed by refreshing schema
+        self._refreshed_names = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        # instrumentation counters
+        self.stats = Counter()
+
+    def get_or_create(self, name, create, definition=None, owner=None):
+        """
+            Return the type registered under `name`; it is built by calling `create()`
+            and registered first if needed.
+
+            `owner` is the schema requesting the type; within a schema, the first
+            definition of a name is kept. When another schema requests the same
+            name, its `definition` must match the registered one.
+        """
+        with self._lock:
+            graphql_type = self._types.get(name)
+            refreshed_names = self._refreshed_names.get(owner) if owner is not None else None
+            if graphql_type is None:
+                self.stats['misses'] += 1
+                if refreshed_names is not None:
+                    refreshed_names.add(name)
+                graphql_type = self._types[name] = create()
+                self._definitions[name] = definition
+                self._owners[name] = weakref.WeakSet(() if owner is None else (owner,))
+                return graphql_type
+            owners = self._owners[name]
+            if refreshed_names is not None and name not in refreshed_names and owner in owners:
+                self.stats['misses'] += 1
+                refreshed_names.add(name)
+                # updated in place, for the fields & schemas already referring to it
+                vars(graphql_type).clear()
+                vars(graphql_type).update(vars(create()))
+                self._definitions[name] = definition
+                self._fingerprints.pop(name, None)
+                return graphql_type
+            if owner is not None and owner not in owners:
+                # fingerprints are only computed for registries shared between schemas
+                if name not in self._fingerprints:
+                    self._fingerprints[name] = _get_fingerprint(self._definitions[name])
+                if _get_fingerprint(definition) != self._fingerprints[name]:
+                    raise ValueError(f'Type `{name}` is already registered with a different definition')
+                owners.add(owner)
+            self.stats['hits'] += 1
+        return graphql_type
+
+    @contextlib.contextmanager
+    def refreshing(self, owner):
+        """
+            Within this context, types already registered by `owner` are built again
+            the first time it requests them, e.g. when the models they describe are
+            linked to models exposed afterwards.
+        """
+        with self._lock:
+            self._refreshed_names[owner] = set()
+        try:
+            yield
+        finally:
+            with self._lock:
+                del self._refreshed_names[owner]
+
+    def get_stats(self):
+        """
+            Return the number of registered types, by kind, along with cache hits and
+            misses counters.
+        """
+        result = {
+            'size': len(self._types),
+            'hits': self.stats['hits'],
+            'misses': self.stats['misses'],
+        }
+        for suffix in ('output_type', 'input_type', 'enum_type'):
+            result[f'{suffix}s'] = sum(1 for name in self._types if name.endswith(f'__{suffix}'))
+        return result
+
+    def clear(self):
+        """
+            Forget every registered type.
+        """
+        with self._lock:
+            self._types.clear()
+            self._definitions.clear()
+            self._fingerprints.clear()
+            self._owners.clear()
+
+    def __len__(self):
+        return len(self._types)
+
+    def __contains__(self, name):
+        return name in self._types
+
+    def __iter__(self):
+        return iter(list(self._types))
+
+
+def _get_fingerprint(definition):
+    """
+        Structural description of a type definition, as a `str`; types registered
+        under the same name must have the same description.
+    """
+    if isinstance(definition, dict):
+        items = ', '.join(f'{key}: {_get_fingerprint(value)}' for key, value in sorted(definition.items()))
+        return f'{{{items}}}'
+    if isinstance(definition, (list, tuple)):
+        return f'[{", ".join(map(_get_fingerprint, definition))}]'
+    if isinstance(definition, (set, frozenset)):
+        return f'{{{", ".join(sorted(map(_get_fingerprint, definition)))}}}'
+    if isinstance(definition, (types.Required, types.ModelField, types.ModelInterface)):
+        slots = ', '.join(_get_fingerprint(getattr(definition, slot)) for slot in definition.__slots__)
+        return f'{type(definition).__name__}({slots})'
+    if isinstance(definition, GraphQLType):
+        return str(definition)
+    if inspect.isclass(definition):
+        return f'{definition.__module__}.{definition.__qualname__}'
+    return repr(definition)
@@ -12,6 +12,8 @@ class Required:
         Non-GraphQL wrapper type, to replace NonNull in mappings or when using
         "natural" Python types
     """
+    __slots__ = ('type_',)
+
     def __init__(self, type_):
         self.type_ = type_
 
@@ -22,6 +24,8 @@ class ModelField:
     """
     # pylint: disable=too-few-public-methods
 
+    __slots__ = ('model_name', 'field_path')
+
     def __init__(self, model_name, field_path=None):
         self.model_name = model_name
         self.field_path = field_path or []
@@ -40,6 +44,8 @@ class ModelInterface:
     """
     # pylint: disable=too-few-public-methods
 
+    __slots__ = ('model_name', 'operation', 'exclude', 'additional')
+
     def __init__(self, model_name, operation, exclude=None, additional=None):
         self.model_name = model_name
         self.operation = operation
@@ -65,6 +71,8 @@ class Model:
         Non-GraphQL wrapper type, to use the same interface as an already exposed model.
     """
 
+    __slots__ = ('model_name',)
+
     def __init__(self, model_name):
         self.model_name = model_name
 
@@ -0,0 +1,13 @@
+from tests.django.models import Person, BankAccount
+
+for username, ibans in (
+        ('michel.dupont@example.com', ('FR7630006000011234567890189', 'FR7630006000011234567890190')),
+        ('jean.dupont@example.com', ('FR7630006000011234567890191',)),
+        ('jean.martin@example.com', ('FR7630006000011234567890192',))):
+    first_name, last_name = username.split('@')[0].split('.')
+    owner = Person.objects.create(
+        username = username,
+        first_name = first_name.capitalize(),
+        last_name = last_name.capitalize())
+    for iban in ibans:
+        BankAccount.objects.create(owner=owner, iban=iban)
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='house',
+            name='version',
+            field=models.IntegerField(blank=True, default=1),
+        ),
+    ]
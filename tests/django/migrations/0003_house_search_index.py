@@ -0,0 +1,19 @@
+from django.db import migrations
+
+from easy_graphql_server.orm.django_search import ensure_search_index
+
+
+def create_house_search_index(apps, schema_editor):
+    house_model = apps.get_model('django', 'House')
+    ensure_search_index(house_model, ('location',), schema_editor.connection.alias)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django', '0002_house_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_house_search_index, migrations.RunPython.noop),
+    ]
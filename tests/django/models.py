@@ -93,6 +93,7 @@ class House(models.Model):
         null=True,
         on_delete=models.SET_NULL,
         related_name='houses')
+    version = models.IntegerField(blank=True, default=1)
     @staticmethod
     def filter_for_user(queryset, authenticated_user):
         if not authenticated_user:
@@ -40,6 +40,9 @@ schema.expose_query(
 schema.expose_model(
     orm_model = House,
     name = 'house',
+    searchable_fields = ('location',),
+    version_field = 'version',
+    can_claim = True,
     custom_fields = [
         {
             'name': 'tenants_occupations',
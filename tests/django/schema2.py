@@ -32,7 +32,7 @@ class ExposedMe(schema.ExposedQuery):
     require_authenticated_user = True
     pass_authenticated_user = True
     output_format = easy_graphql_server.Model('person').output_format + {
-        'is_superuser': bool, 'is_staff': bool}
+        'is_superuser': bool, 'is_staff': bool} - ('houses', 'home', 'daily_occupations')
     @staticmethod
     def method(authenticated_user):
         return authenticated_user
@@ -44,10 +44,10 @@ class ExposedDailyOccupation(schema.ExposedModel):
 
 class ExposedHouseTenantsOccupations(easy_graphql_server.CustomField):
     name = 'tenants_occupations'
-    format = {
-        'total_hours_per_day': int,
-        'occupations': easy_graphql_server.Model('dailyoccupation').fields.occupation,
-    }
+    format = [{
+        'hours_per_day': int,
+        'occupation': easy_graphql_server.Model('daily_occupation').fields.occupation,
+    }]
     @staticmethod
     def read_one(instance, authenticated_user, graphql_selection):
         return [
@@ -64,6 +64,9 @@ class ExposedHouseTenantsOccupations(easy_graphql_server.CustomField):
 class ExposedHouse(schema.ExposedModel):
     orm_model = House
     name = 'house'
+    searchable_fields = ('location',)
+    version_field = 'version'
+    can_claim = True
     custom_fields = [ExposedHouseTenantsOccupations]
 
 class ExposedBankAccount(schema.ExposedModel):
@@ -37,10 +37,10 @@ class ExposedMe(easy_graphql_server.ExposedQuery):
 
 class ExposedHouseTenantsOccupations(easy_graphql_server.CustomField):
     name = 'tenants_occupations'
-    format = {
-        'total_hours_per_day': int,
-        'occupations': easy_graphql_server.Model('dailyoccupation').fields.occupation,
-    }
+    format = [{
+        'hours_per_day': int,
+        'occupation': easy_graphql_server.Model('daily_occupation').fields.occupation,
+    }]
     @staticmethod
     def read_one(instance, authenticated_user, graphql_selection):
         return [
@@ -57,6 +57,9 @@ class ExposedHouseTenantsOccupations(easy_graphql_server.CustomField):
 class ExposedHouse(easy_graphql_server.ExposedModel):
     orm_model = House
     name = 'house'
+    searchable_fields = ('location',)
+    version_field = 'version'
+    can_claim = True
     custom_fields = [ExposedHouseTenantsOccupations]
 
 class ExposedDailyOccupation(easy_graphql_server.ExposedModel):
@@ -0,0 +1,80 @@
+import threading
+import unittest
+
+import django.db.transaction
+
+import easy_graphql_server
+from easy_graphql_server.background import BackgroundExecutor
+
+from .django.base_django_test import BaseDjangoTest
+from .django.models import House
+
+
+class BackgroundExecutorTest(unittest.TestCase):
+
+    def test_synchronous(self):
+        executor = BackgroundExecutor(synchronous=True)
+        threads = []
+        executor.submit(lambda: threads.append(threading.current_thread()))
+        self.assertEqual(threads, [threading.current_thread()])
+
+    def test_background(self):
+        executor = BackgroundExecutor(max_workers=2)
+        threads = []
+        for _ in range(10):
+            executor.submit(lambda: threads.append(threading.current_thread()))
+        executor.shutdown()
+        self.assertEqual(len(threads), 10)
+        self.assertNotIn(threading.current_thread(), threads)
+
+    def test_backpressure(self):
+        executor = BackgroundExecutor(max_workers=1, max_pending=0)
+        released = threading.Event()
+        threads = []
+        # first callback occupies the only slot...
+        executor.submit(released.wait)
+        # ...so the next one is run in the submitting thread
+        executor.submit(lambda: threads.append(threading.current_thread()))
+        self.assertEqual(threads, [threading.current_thread()])
+        released.set()
+        executor.shutdown()
+
+    def test_errors_are_logged(self):
+        executor = BackgroundExecutor(synchronous=True)
+        with self.assertLogs('easy_graphql_server.background', 'ERROR'):
+            executor.submit(lambda: 1 / 0)
+
+
+class AfterCommitTest(BaseDjangoTest):
+
+    def setUp(self):
+        super().setUp()
+        self.calls = []
+        self.schema = easy_graphql_server.Schema(after_commit_synchronous=True)
+        self.schema.expose_model(
+            orm_model = House,
+            name = 'house',
+            on_after_commit = lambda instance, authenticated_user, operation, data, depth:
+                self.calls.append((operation, instance.location,
+                    django.db.connection.in_atomic_block)),
+        )
+        self.user = self.get_or_create_user('superadmin@example.com')
+
+    def _create_house(self, location):
+        return self.schema.execute(
+            query = 'mutation ($location: String!) { create_house (location: $location) { id } }',
+            variables = {'location': location},
+            authenticated_user = self.user,
+            serializable_output = True)
+
+    def test_called_after_commit(self):
+        self._create_house('Seaside')
+        self.assertEqual(self.calls, [(easy_graphql_server.Operation.CREATE, 'Seaside', False)])
+
+    def test_not_called_after_rollback(self):
+        with self.assertRaises(RuntimeError):
+            with django.db.transaction.atomic():
+                self._create_house('Seaside')
+                self.assertEqual(self.calls, [])
+                raise RuntimeError()
+        self.assertEqual(self.calls, [])
@@ -0,0 +1,94 @@
+import json
+
+from django.test.utils import CaptureQueriesContext
+import django.db
+
+import easy_graphql_server
+
+from .django.base_django_test import BaseDjangoTest
+from .django.models import Person, House, DailyOccupation
+
+
+class AtomicMutationsTest(BaseDjangoTest):
+
+    def setUp(self):
+        super().setUp()
+        self.schema = easy_graphql_server.Schema(atomic_mutations=True)
+        self.schema.expose_model(
+            orm_model = Person,
+            name = 'person',
+            plural_name = 'people',
+            can_expose = ('id', 'username', 'first_name', 'last_name', 'daily_occupations'),
+        )
+        self.schema.expose_model(
+            orm_model = House,
+            name = 'house',
+        )
+        self.schema.expose_model(
+            orm_model = DailyOccupation,
+            name = 'daily_occupation',
+            only_when_child_of = Person,
+        )
+        self.user = self.get_or_create_user('superadmin@example.com')
+
+    def _execute(self, query):
+        return self.schema.execute(
+            query = query,
+            authenticated_user = self.user,
+            serializable_output = True)
+
+    def test_single_transaction(self):
+        with CaptureQueriesContext(django.db.connection) as context:
+            result = self._execute('''mutation {
+                first: create_house (location: "Seaside") { location }
+                second: create_house (location: "Riverside") { location }
+            }''')
+        self.assertEqual(result, {'data': {
+            'first': {'location': 'Seaside'},
+            'second': {'location': 'Riverside'},
+        }})
+        self.assertEqual(House.objects.count(), 2)
+        self.assertEqual(
+            len([query for query in context.captured_queries if query['sql'] == 'BEGIN']), 1)
+
+    def test_all_or_nothing(self):
+        result = self._execute('''mutation {
+            create_house (location: "Seaside") { location }
+            update_house (id: 123456, _: {location: "Riverside"}) { location }
+        }''')
+        self.assertIsNone(result['data'])
+        self.assertEqual(len(result['errors']), 1)
+        self.assertEqual(House.objects.count(), 0)
+
+    def test_deferred_validation(self):
+        # the first update alone would be invalid, as hours do not amount to 24
+        result = self._execute('''mutation {
+            first: update_person (username: "superadmin@example.com", _: {daily_occupations: [
+                {occupation: SLEEP, hours_per_day: 8}
+            ]}) { username }
+            second: update_person (username: "superadmin@example.com", _: {daily_occupations: [
+                {occupation: SLEEP, hours_per_day: 8}
+                {occupation: WORK, hours_per_day: 16}
+            ]}) { username }
+        }''')
+        self.assertNotIn('errors', result)
+        self.assertEqual(DailyOccupation.objects.count(), 2)
+
+    def test_deferred_validation_failure(self):
+        result = self._execute('''mutation {
+            create_house (location: "Seaside") { location }
+            update_person (username: "superadmin@example.com", _: {daily_occupations: [
+                {occupation: SLEEP, hours_per_day: 8}
+            ]}) { username }
+        }''')
+        self.assertIsNone(result['data'])
+        error = json.loads(result['errors'][0]['message'])
+        self.assertEqual(error['type'], 'VALIDATION')
+        self.assertEqual(error['payload'][0]['path'], ['mutation', 'update_person', 'daily_occupations'])
+        self.assertEqual(error['payload'][0]['code'], 'hours_sum')
+        self.assertEqual(House.objects.count(), 0)
+        self.assertEqual(DailyOccupation.objects.count(), 0)
+
+    def test_queries_are_not_affected(self):
+        result = self._execute('query { houses { location } }')
+        self.assertEqual(result, {'data': {'houses': []}})
@@ -0,0 +1,151 @@
+import unittest
+from unittest import mock
+
+from django.test.utils import CaptureQueriesContext
+import django.core.exceptions
+import django.db
+
+import easy_graphql_server
+from easy_graphql_server.orm.django_upsert import supports_native_upsert
+
+from .django.base_django_test import BaseDjangoTest
+from .django.models import House, Person
+
+
+class BulkMutationsTest(BaseDjangoTest):
+
+    def setUp(self):
+        super().setUp()
+        self.schema = easy_graphql_server.Schema()
+        self.schema.expose_model(
+            orm_model = House,
+            name = 'house',
+            batch_size = 2,
+        )
+        self.schema.expose_model(
+            orm_model = Person,
+            name = 'person',
+            plural_name = 'people',
+            can_expose = ('id', 'username', 'first_name', 'last_name'),
+        )
+        self.user = self.get_or_create_user('superadmin@example.com')
+
+    def _execute(self, query):
+        return self.schema.execute(
+            query = query,
+            authenticated_user = self.user,
+            serializable_output = True)
+
+    def test_update_many_by_chunks(self):
+        House.objects.bulk_create([House(location=f'House #{index}') for index in range(5)])
+        with CaptureQueriesContext(django.db.connection) as context:
+            result = self._execute('''mutation {
+                update_houses (_: {location: "Seaside"}) { count results { location } }
+            }''')
+        self.assertEqual(result, {'data': {'update_houses': {
+            'count': 5,
+            'results': [{'location': 'Seaside'}] * 5,
+        }}})
+        # identifiers never exceed the chunk size within a query
+        updates = [query for query in context.captured_queries if query['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 3)
+
+    def test_delete_many_errors_paths(self):
+        House.objects.bulk_create([House(location=f'House #{index}') for index in range(5)])
+        protected_house_id = House.objects.order_by('pk')[3].id
+        def has_permission(instance, authenticated_user, operation, data):
+            return instance.id != protected_house_id
+        def on_before_operation(instance, authenticated_user, operation, data, depth):
+            if instance.id == protected_house_id:
+                raise django.core.exceptions.ValidationError({'location': 'This house is protected.'})
+        callbacks = self.schema.get_model_config(name='house').callbacks
+        for callback_name, callback in (('has_permission', has_permission),
+                ('on_before_operation', on_before_operation)):
+            callbacks[callback_name].append(callback)
+            result = self._execute('mutation { delete_houses { count } }')
+            # the path locates the instance, beyond the first chunk
+            self.assertEqual(result['errors'][0]['path'], ['delete_houses'])
+            self.assertIn('"path": ["mutation", "delete_houses", 3', result['errors'][0]['message'])
+            self.assertEqual(House.objects.count(), 5)
+            callbacks[callback_name].remove(callback)
+
+    @staticmethod
+    def _bulk_create_returning_rows(bulk_create):
+        # emulate `INSERT ... RETURNING` where the backend lacks it (SQLite before Django 4.0)
+        features = django.db.connection.features
+        if features.can_return_rows_from_bulk_insert:
+            return bulk_create
+        def decorated(objs, *args, **kwargs):
+            with mock.patch.object(type(features), 'can_return_rows_from_bulk_insert', False):
+                objs = bulk_create(objs, *args, **kwargs)
+            identifiers = House.objects.order_by('-pk').values_list('pk', flat=True)[:len(objs)]
+            for obj, identifier in zip(objs, reversed(identifiers)):
+                obj.pk = identifier
+            return objs
+        return decorated
+
+    def test_create_many_bulk_insert(self):
+        # force `bulk_create()`, which is used only when primary keys can be returned
+        bulk_create = self._bulk_create_returning_rows(House.objects.bulk_create)
+        features = django.db.connection.features
+        with mock.patch.object(type(features), 'can_return_rows_from_bulk_insert', True), \
+                mock.patch.object(House.objects, 'bulk_create', bulk_create), \
+                CaptureQueriesContext(django.db.connection) as context:
+            result = self._execute('''mutation {
+                create_houses (items: [
+                    {location: "Seaside"}
+                    {location: "Riverside"}
+                    {location: "Hillside"}
+                ]) { id location }
+            }''')
+        self.assertEqual(result, {'data': {'create_houses': [
+            {'id': house.id, 'location': house.location}
+            for house in House.objects.order_by('id')
+        ]}})
+        self.assertEqual([house['location'] for house in result['data']['create_houses']],
+            ['Seaside', 'Riverside', 'Hillside'])
+        # chunks of `batch_size` instances
+        inserts = [query for query in context.captured_queries if query['sql'].startswith('INSERT')]
+        self.assertEqual(len(inserts), 2)
+
+    @unittest.skipUnless(supports_native_upsert(House), 'native upserts are not supported')
+    def test_upsert_natively(self):
+        house = House.objects.create(location='Seaside')
+        with CaptureQueriesContext(django.db.connection) as context:
+            result = self._execute(f'''mutation {{
+                updated: upsert_house (id: {house.id}, _: {{location: "Riverside"}}) {{ id location }}
+                created: upsert_house (id: {house.id + 1}, _: {{location: "Hillside"}}) {{ id location }}
+            }}''')
+        self.assertEqual(result, {'data': {
+            'updated': {'id': house.id, 'location': 'Riverside'},
+            'created': {'id': house.id + 1, 'location': 'Hillside'},
+        }})
+        self.assertEqual(House.objects.count(), 2)
+        # one `INSERT ... ON CONFLICT` statement per upsert
+        inserts = [query for query in context.captured_queries if query['sql'].startswith('INSERT')]
+        self.assertEqual(len(inserts), 2)
+        self.assertTrue(all('ON CONFLICT' in query['sql'] for query in inserts))
+
+    def test_upsert_many_concurrent_insertion(self):
+        # pylint: disable=protected-access
+        manager = self.schema.get_model_config(name='person').orm_model_manager
+        lock_existing_instances = manager._lock_existing_instances
+        def lock_before_concurrent_insertion(**kwargs):
+            # a concurrent transaction inserts the person once existing ones are locked...
+            if not Person.objects.filter(username='jean.dupont@example.com').exists():
+                Person.objects.create(username='jean.dupont@example.com', first_name='J', last_name='D')
+                return {}
+            return lock_existing_instances(**kwargs)
+        with mock.patch.object(manager, '_lock_existing_instances', lock_before_concurrent_insertion):
+            result = self._execute('''mutation {
+                upsert_people (key: USERNAME, items: [
+                    {username: "jean.dupont@example.com", first_name: "Jean", last_name: "Dupont"}
+                    {username: "paul.martin@example.com", first_name: "Paul", last_name: "Martin"}
+                ]) { username first_name }
+            }''')
+        # ...so that its insertion fails, and is retried as an update
+        self.assertEqual(result, {'data': {'upsert_people': [
+            {'username': 'jean.dupont@example.com', 'first_name': 'Jean'},
+            {'username': 'paul.martin@example.com', 'first_name': 'Paul'},
+        ]}})
+        self.assertEqual(Person.objects.filter(username__endswith='@example.com').count(), 3)
@@ -0,0 +1,105 @@
+import unittest
+
+import django.db
+
+import easy_graphql_server
+from easy_graphql_server.orm.django_retry import is_retryable_error, get_retry_delay
+
+from .django.base_django_test import BaseDjangoTest
+from .django.models import House
+
+
+class RetryableErrorTest(unittest.TestCase):
+
+    def _make_error(self, message, cause=None):
+        try:
+            raise django.db.OperationalError(message) from cause
+        except django.db.OperationalError as error:
+            return error
+
+    def test_classification(self):
+        self.assertTrue(is_retryable_error(self._make_error('database is locked')))
+        self.assertFalse(is_retryable_error(self._make_error('no such table: house')))
+        self.assertFalse(is_retryable_error(django.db.IntegrityError('database is locked')))
+
+    def test_postgresql_serialization_failure(self):
+        cause = Exception('could not serialize access due to concurrent update')
+        cause.pgcode = '40001'
+        self.assertTrue(is_retryable_error(self._make_error(str(cause), cause)))
+
+    def test_mysql_deadlock(self):
+        cause = Exception(1213, 'Deadlock found when trying to get lock')
+        self.assertTrue(is_retryable_error(self._make_error(str(cause), cause)))
+
+    def test_delay(self):
+        for attempt in range(1, 10):
+            delay = get_retry_delay(attempt, base_delay=0.01, max_delay=0.1)
+            self.assertGreaterEqual(delay, 0)
+            self.assertLessEqual(delay, min(0.1, 0.01 * 2 ** (attempt - 1)))
+
+
+class RetryTest(BaseDjangoTest):
+
+    def setUp(self):
+        super().setUp()
+        self.failures = 0
+        self.attempts = 0
+        self.failing_operation = easy_graphql_server.Operation.CREATE
+        self.schema = easy_graphql_server.Schema(
+            transactions_max_retries = 2,
+            transactions_retry_base_delay = 0)
+        self.schema.expose_model(
+            orm_model = House,
+            name = 'house',
+            on_before_operation = self._on_before_operation,
+        )
+        self.user = self.get_or_create_user('superadmin@example.com')
+
+    def _on_before_operation(self, instance, authenticated_user, operation, data, depth):
+        if operation != self.failing_operation:
+            return
+        self.attempts += 1
+        if self.attempts <= self.failures:
+            raise django.db.OperationalError('database is locked')
+
+    def _create_house(self):
+        return self.schema.execute(
+            query = 'mutation { create_house (location: "Seaside") { location } }',
+            authenticated_user = self.user,
+            serializable_output = True)
+
+    def test_retried(self):
+        self.failures = 2
+        result = self._create_house()
+        self.assertEqual(result, {'data': {'create_house': {'location': 'Seaside'}}})
+        self.assertEqual(self.attempts, 3)
+        self.assertEqual(self.schema.stats['transactions_retries'], 2)
+        self.assertEqual(House.objects.count(), 1)
+
+    def test_retries_exhausted(self):
+        self.failures = 3
+        result = self._create_house()
+        self.assertIsNone(result['data']['create_house'])
+        self.assertEqual(self.attempts, 3)
+        self.assertEqual(self.schema.stats['transactions_retries_exhausted'], 1)
+        self.assertEqual(House.objects.count(), 0)
+
+    def test_not_retried_within_transaction(self):
+        self.failures = 1
+        with django.db.transaction.atomic():
+            result = self._create_house()
+        self.assertIsNone(result['data']['create_house'])
+        self.assertEqual(self.attempts, 1)
+        self.assertEqual(self.schema.stats['transactions_retries'], 0)
+
+    def test_update_retried(self):
+        house = House.objects.create(location='Seaside')
+        self.failing_operation = easy_graphql_server.Operation.UPDATE
+        self.failures = 1
+        result = self.schema.execute(
+            query = f'mutation {{ update_house (id: {house.id}, _: {{location: "Hillside"}}) {{ location }} }}',
+            authenticated_user = self.user,
+            serializable_output = True)
+        self.assertEqual(result, {'data': {'update_house': {'location': 'Hillside'}}})
+        self.assertEqual(self.attempts, 2)
+        self.assertEqual(self.schema.stats['transactions_retries'], 1)
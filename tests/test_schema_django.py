@@ -1,6 +1,13 @@
+import os
+import tempfile
+import threading
 import unittest
+from unittest import mock
+
+import easy_graphql_server
 
 from .django.schema1 import schema
+from .django.models import House, Person
 
 
 class SchemaTest(unittest.TestCase):
@@ -90,3 +97,274 @@ class SchemaTest(unittest.TestCase):
             output_type = self._get_output_type(output_type_name)
             gender = self._get_from_schema(output_type, name='gender')
             self._check_gender_type(gender['type'])
+
+    def test_late_exposure(self):
+        late_schema = easy_graphql_server.Schema()
+        class ExposedHouse(late_schema.ExposedModel):
+            orm_model = House
+            name = 'house'
+        late_schema.expose_query(name='first', output_format=int, method=lambda: 1)
+        self.assertEqual(late_schema.execute('{ first }').data, {'first': 1})
+        # only the new query is added, models are not exposed again
+        late_schema.expose_query(name='second', output_format=int, method=lambda: 2)
+        self.assertEqual(late_schema.execute('{ first second }').data, {'first': 1, 'second': 2})
+        self.assertEqual(len(late_schema.models_configs), 1)
+        # new queries are still validated
+        late_schema.expose_query(name='bad-name', output_format=int, method=lambda: 3)
+        with self.assertRaises(Exception):
+            late_schema.execute('{ first }')
+
+    def test_late_linked_exposure(self):
+        for lazy_models in (False, True):
+            for exposed_first in ('house', 'person'):
+                late_schema = easy_graphql_server.Schema(lazy_models=lazy_models)
+                exposures = {
+                    'house': lambda: late_schema.expose_model(orm_model=House, name='house'),
+                    'person': lambda: late_schema.expose_model(orm_model=Person, name='person',
+                        plural_name='people'),
+                }
+                exposures.pop(exposed_first)()
+                late_schema.execute('{ __typename }')
+                # models already exposed are linked to the new one
+                exposures.popitem()[1]()
+                late_schema.execute('{ __typename }')
+                late_schema.check()
+                graphql_schema = late_schema.graphql_schema
+                self.assertIn('owner', graphql_schema.get_type('house__output_type').fields)
+                self.assertIn('houses', graphql_schema.get_type('person__output_type').fields)
+                self.assertIn('owner', graphql_schema.mutation_type.fields['create_house'].args)
+
+    def test_snapshot(self):
+        snapshot_schema = easy_graphql_server.Schema()
+        snapshot_schema.expose_query(name='first', output_format=int, method=lambda: 1)
+        self.assertTrue(snapshot_schema.dirty)
+        self.assertEqual(snapshot_schema.execute('{ first }').data, {'first': 1})
+        self.assertFalse(snapshot_schema.dirty)
+        graphql_schema = snapshot_schema.graphql_schema
+        # locks are not shared between schemas
+        self.assertIsNot(snapshot_schema._lock, schema._lock) # pylint: disable=protected-access
+        # while another thread holds the lock, the previous snapshot is still readable
+        snapshot_schema.expose_query(name='second', output_format=int, method=lambda: 2)
+        self.assertTrue(snapshot_schema.dirty)
+        locked = threading.Event()
+        released = threading.Event()
+        def hold_lock():
+            with snapshot_schema._lock: # pylint: disable=protected-access
+                locked.set()
+                released.wait()
+        thread = threading.Thread(target=hold_lock)
+        thread.start()
+        locked.wait()
+        self.assertEqual(snapshot_schema.execute('{ first }').data, {'first': 1})
+        self.assertIs(snapshot_schema.graphql_schema, graphql_schema)
+        released.set()
+        thread.join()
+        # then the schema is rebuilt
+        self.assertEqual(snapshot_schema.execute('{ second }').data, {'second': 2})
+        self.assertIsNot(snapshot_schema.graphql_schema, graphql_schema)
+        self.assertFalse(snapshot_schema.dirty)
+
+    def test_linked_managers(self):
+        linked_schema = easy_graphql_server.Schema()
+        linked_schema.expose_model(orm_model=House, name='house')
+        house_manager = linked_schema.get_model_config(name='house').orm_model_manager
+        self.assertIs(linked_schema.get_model_config(orm_model=House).orm_model_manager, house_manager)
+        self.assertIsNone(house_manager.get_linked_manager('owner'))
+        # links are resolved again when a linked model is exposed
+        linked_schema.expose_model(orm_model=Person, name='person', plural_name='people')
+        linked_schema.check()
+        person_manager = linked_schema.get_model_config(orm_model=Person).orm_model_manager
+        self.assertIs(house_manager.get_linked_manager('owner'), person_manager)
+        self.assertIs(person_manager.get_linked_manager('houses'), house_manager)
+
+    def test_type_registry(self):
+        schemas = [easy_graphql_server.Schema() for _ in range(2)]
+        for index, tenant_schema in enumerate(schemas):
+            tenant_schema.expose_query(name='tenant', output_format={'index': int},
+                method=lambda index=index: {'index': index})
+        first_type, second_type = (
+            tenant_schema._get_graphql_schema().query_type.fields['tenant'].type # pylint: disable=protected-access
+            for tenant_schema in schemas)
+        # types are not leaked from a schema to another...
+        self.assertIsNot(first_type, second_type)
+        self.assertEqual(schemas[1].type_registry.get_stats()['output_types'], 1)
+        self.assertIn('tenant__output_type', schemas[1].type_registry)
+        # ...unless explicitly requested
+        type_registry = easy_graphql_server.TypeRegistry()
+        shared_types = []
+        for _ in range(2):
+            tenant_schema = easy_graphql_server.Schema(type_registry=type_registry)
+            tenant_schema.expose_query(name='tenant', output_format={'index': int},
+                method=lambda: {'index': 0})
+            shared_types.append(
+                tenant_schema._get_graphql_schema().query_type.fields['tenant'].type) # pylint: disable=protected-access
+        self.assertIs(shared_types[0], shared_types[1])
+        self.assertEqual(type_registry.stats['hits'], 1)
+        # different types cannot be shared under the same name
+        tenant_schema = easy_graphql_server.Schema(type_registry=type_registry)
+        with self.assertRaises(ValueError):
+            tenant_schema.expose_query(name='tenant', output_format={'index': str},
+                method=lambda: {'index': '0'})
+
+    def test_type_registry_redefinitions(self):
+        # within a schema, the first definition of a type name is kept, as before
+        private_schema = easy_graphql_server.Schema()
+        private_schema.expose_model(orm_model=House, name='house')
+        private_schema.expose_model(orm_model=Person, name='person', plural_name='people')
+        private_schema.expose_mutation(name='check_person', method=lambda **data: True,
+            input_format={'person': easy_graphql_server.Model('person').create_input_format}, output_format=bool)
+        private_schema.expose_mutation(name='check_person_change', method=lambda **data: True,
+            input_format={'person': easy_graphql_server.Model('person').update_input_format}, output_format=bool)
+        late_schema = easy_graphql_server.Schema()
+        late_schema.expose_model(orm_model=House, name='house')
+        late_schema.expose_query(name='first_house', method=lambda: None,
+            output_format=easy_graphql_server.Model('house').output_format)
+        # houses are now linked to people, so their output type changes
+        late_schema.expose_model(orm_model=Person, name='person', plural_name='people')
+        late_schema.expose_query(name='last_house', method=lambda: None,
+            output_format=easy_graphql_server.Model('house').output_format)
+        for tested_schema in (private_schema, late_schema):
+            tested_schema.check()
+
+    def test_type_mappings_memoization(self):
+        memo_schema = easy_graphql_server.Schema()
+        memo_schema.expose_model(orm_model=House, name='house')
+        model_config = memo_schema.get_model_config(name='house')
+        mapping = model_config.get_type_mapping(easy_graphql_server.READ)
+        mapping.pop('location')
+        self.assertIn('location', model_config.get_type_mapping(easy_graphql_server.READ))
+        self.assertEqual(memo_schema.stats['type_mappings_computed'], 1)
+        self.assertEqual(memo_schema.stats['type_mappings_reused'], 1)
+        self.assertNotIn('owner', mapping)
+        # mappings are computed again when linked models are exposed
+        memo_schema.expose_model(orm_model=Person, name='person', plural_name='people')
+        self.assertIn('owner', model_config.get_type_mapping(easy_graphql_server.READ))
+
+    def test_disk_snapshot(self):
+        def make_schema(*queries):
+            tenant_schema = easy_graphql_server.Schema()
+            tenant_schema.expose_model(orm_model=House, name='house')
+            for query in queries:
+                tenant_schema.expose_query(name=query, output_format=int, method=lambda: 1)
+            return tenant_schema
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'schema.graphql')
+            make_schema('first').save_snapshot(path)
+            with open(path, encoding='utf-8') as file:
+                self.assertIn('first: Int', file.read())
+            # same schema in another worker
+            worker_schema = make_schema('first')
+            self.assertTrue(worker_schema.load_snapshot(path))
+            self.assertFalse(worker_schema.dirty)
+            self.assertEqual(worker_schema.execute('{ first }').data, {'first': 1})
+            # outdated snapshot
+            with self.assertLogs('easy_graphql_server.processing', 'WARNING'):
+                self.assertFalse(make_schema('first', 'second').load_snapshot(path))
+            # missing snapshot
+            with self.assertLogs('easy_graphql_server.processing', 'WARNING'):
+                self.assertFalse(make_schema('first').load_snapshot(path + '.missing'))
+
+    def test_lazy_models(self):
+        lazy_schema = easy_graphql_server.Schema(lazy_models=True)
+        lazy_schema.expose_model(orm_model=House, name='house')
+        lazy_schema.expose_model(orm_model=Person, name='person', plural_name='people')
+        lazy_schema.expose_query(name='first', output_format=int, method=lambda: 1)
+        self.assertEqual(lazy_schema.execute('{ first }').data, {'first': 1})
+        self.assertNotIn('houses', lazy_schema.methods['query'])
+        # models are exposed when queried, even through fragments
+        result = lazy_schema.execute('''
+            query { ...locations }
+            fragment locations on Query { houses (location: "Atlantis") { location } }
+        ''')
+        self.assertEqual(result.data, {'houses': []})
+        self.assertIn('delete_house', lazy_schema.methods['mutation'])
+        self.assertNotIn('people', lazy_schema.methods['query'])
+        # introspection exposes every model
+        lazy_schema.get_documentation()
+        self.assertIn('people', lazy_schema.methods['query'])
+        # root fields of queries sent again are not parsed again
+        with mock.patch('easy_graphql_server.schema.parse', side_effect=AssertionError):
+            self.assertEqual(lazy_schema.execute('{ first }').data, {'first': 1})
+
+    def test_lazy_models_stale_snapshot(self):
+        # pylint: disable=protected-access
+        lazy_schema = easy_graphql_server.Schema(lazy_models=True)
+        lazy_schema.expose_model(orm_model=House, name='house')
+        lazy_schema.expose_query(name='first', output_format=int, method=lambda: 1)
+        lazy_schema.execute('{ first }')
+        stale_graphql_schema = lazy_schema._get_graphql_schema()
+        # while another thread builds the new snapshot...
+        locked, release = threading.Event(), threading.Event()
+        def hold_lock():
+            with lazy_schema._lock:
+                locked.set()
+                release.wait()
+        holder = threading.Thread(target=hold_lock)
+        holder.start()
+        locked.wait()
+        results = []
+        querier = threading.Thread(target=lambda: results.append(lazy_schema._get_graphql_schema(
+            lazy_schema._expose_queried_models('{ houses { location } }'))))
+        querier.start()
+        # ...the previous one is only used for queries it can answer
+        querier.join(timeout=0.2)
+        self.assertTrue(querier.is_alive())
+        self.assertIs(lazy_schema._get_graphql_schema({'first'}), stale_graphql_schema)
+        release.set()
+        holder.join()
+        querier.join()
+        self.assertIn('houses', results[0].query_type.fields)
+
+    def test_stale_snapshot(self):
+        # pylint: disable=protected-access
+        eager_schema = easy_graphql_server.Schema()
+        eager_schema.expose_query(name='first', output_format=int, method=lambda: 1)
+        eager_schema.execute('{ first }')
+        stale_graphql_schema = eager_schema._get_graphql_schema()
+        eager_schema.expose_query(name='second', output_format=int, method=lambda: 2)
+        # while another thread builds the new snapshot...
+        locked, release = threading.Event(), threading.Event()
+        def hold_lock():
+            with eager_schema._lock:
+                locked.set()
+                release.wait()
+        holder = threading.Thread(target=hold_lock)
+        holder.start()
+        locked.wait()
+        results = []
+        querier = threading.Thread(target=lambda: results.append(eager_schema._get_graphql_schema(
+            eager_schema._expose_queried_models('{ second }'))))
+        querier.start()
+        try:
+            # ...the previous one is only used for queries it can answer
+            querier.join(timeout=0.2)
+            self.assertTrue(querier.is_alive())
+            self.assertIs(eager_schema._get_graphql_schema(
+                eager_schema._expose_queried_models('{ first }')), stale_graphql_schema)
+        finally:
+            release.set()
+            holder.join()
+        querier.join()
+        self.assertIn('second', results[0].query_type.fields)
+
+    def test_warm_up(self):
+        warm_schema = easy_graphql_server.Schema(lazy_models=True)
+        warm_schema.expose_model(orm_model=House, name='house')
+        warm_schema.expose_model(orm_model=Person, name='person', plural_name='people')
+        report = warm_schema.warm_up(['{ houses { location } }'], freeze=False)
+        self.assertFalse(warm_schema.dirty)
+        self.assertIn('houses', warm_schema.methods['query'])
+        self.assertNotIn('people', warm_schema.methods['query'])
+        self.assertGreater(report['duration'], 0)
+        self.assertGreater(report['memory'], 0)
+        with self.assertRaises(Exception):
+            warm_schema.warm_up(['{ houses { unknown_field } }'], freeze=False)
+
+    def test_compact_metadata(self):
+        fields_info = schema.get_model_config(orm_model=House).orm_model_manager.fields_info
+        self.assertIsInstance(fields_info.mandatory, frozenset)
+        self.assertFalse(hasattr(fields_info, '__dict__'))
+        with self.assertRaises(TypeError):
+            fields_info.value['location'] = None
+        with self.assertRaises(AttributeError):
+            fields_info.foreign['owner'].field_name = 'tenant'